@@ -0,0 +1,147 @@
+"""
+Automatic attendance for a whole company-day
+
+Runs daily from the scheduler for the previous day. For every active
+Company Link of a company:
+
+- existing Attendance (manual or built from biometric punches) is kept
+- weekly offs and holidays of the employee's working calendar are skipped
+- employees with an active Shift Assignment and no attendance are marked
+  Absent for that shift; employees without one are only marked Absent when
+  the Company has "Mark Absent Without Shift" set (companies not using
+  shifts), otherwise they are counted as unassigned
+
+Rows are inserted with upsert_attendance without touching existing rows,
+so re-running the same day never creates duplicates or changes a status.
+"""
+
+import time
+
+import frappe
+from frappe.utils import add_days, cint, getdate, nowdate
+
+from saral_hr.saral_hr.doctype.attendance.attendance import upsert_attendance
+from saral_hr.saral_hr.doctype.shift_assignment.shift_assignment import ShiftResolver
+from saral_hr.working_calendar import HOLIDAY, WEEKLY_OFF, WorkingCalendar
+
+AUTO_ATTENDANCE_CHUNK_SIZE = 2000
+MARK_ABSENT = "marked_absent"
+
+
+def daily():
+    """scheduler_events: queue yesterday's attendance per company"""
+    attendance_date = add_days(nowdate(), -1)
+
+    for company in frappe.get_all("Company", pluck="name"):
+        frappe.enqueue(
+            "saral_hr.auto_attendance.generate_company_attendance",
+            queue="long",
+            timeout=3600,
+            company=company,
+            attendance_date=attendance_date,
+            job_id=f"saral_hr:auto_attendance:{company}:{attendance_date}",
+            deduplicate=True,
+        )
+
+
+def generate_company_attendance(company, attendance_date):
+    """
+    Compute attendance of one company for one day and return run statistics
+    """
+    attendance_date = getdate(attendance_date)
+    started = time.monotonic()
+    stats = frappe._dict(
+        company=company,
+        attendance_date=str(attendance_date),
+        employees=0,
+        existing=0,
+        weekly_off=0,
+        holiday=0,
+        unassigned=0,
+        marked_absent=0,
+        seconds=0.0,
+    )
+
+    company_links = frappe.db.sql("""
+        SELECT name
+        FROM `tabCompany Link`
+        WHERE company = %(company)s
+            AND is_active = 1
+            AND (date_of_joining IS NULL OR date_of_joining <= %(date)s)
+    """, {"company": company, "date": attendance_date}, as_dict=True)
+
+    stats.employees = len(company_links)
+    if not company_links:
+        return stats
+
+    marked = set(
+        frappe.get_all(
+            "Attendance",
+            filters={"company": company, "attendance_date": attendance_date},
+            pluck="employee",
+        )
+    )
+
+    employees = [cl.name for cl in company_links]
+    shifts = ShiftResolver(employees, attendance_date, attendance_date)
+    working_calendar = WorkingCalendar(employees)
+    mark_without_shift = frappe.db.get_value("Company", company, "mark_absent_without_shift")
+
+    rows = []
+    for cl in company_links:
+        shift = shifts.get(cl.name, attendance_date)
+        outcome = get_auto_attendance_outcome(
+            cl.name in marked,
+            working_calendar.get_day_type(cl.name, attendance_date),
+            shift,
+            mark_without_shift,
+        )
+
+        if outcome == MARK_ABSENT:
+            rows.append({
+                "employee": cl.name,
+                "attendance_date": attendance_date,
+                "status": "Absent",
+                "shift": shift,
+            })
+        else:
+            stats[outcome] += 1
+
+    for i in range(0, len(rows), AUTO_ATTENDANCE_CHUNK_SIZE):
+        chunk = rows[i : i + AUTO_ATTENDANCE_CHUNK_SIZE]
+
+        # insert only: an attendance marked meanwhile is left untouched
+        upsert_attendance(chunk, update_fields=())
+        frappe.db.commit()
+
+        stats.marked_absent += len(chunk)
+
+    stats.seconds = round(time.monotonic() - started, 3)
+
+    frappe.logger("saral_hr").info(
+        "Auto attendance {company} {attendance_date}: {employees} employees, {existing} existing, "
+        "{weekly_off} weekly off, {holiday} holiday, {unassigned} without shift, {marked_absent} marked absent "
+        "in {seconds}s".format(**stats)
+    )
+
+    return stats
+
+
+def get_auto_attendance_outcome(is_marked, day_type, shift=None, mark_without_shift=0):
+    """
+    What happens to one Company Link: MARK_ABSENT or the stat it is
+    counted in (existing, weekly_off, holiday, unassigned)
+    """
+    if is_marked:
+        return "existing"
+
+    if day_type == WEEKLY_OFF:
+        return "weekly_off"
+
+    if day_type == HOLIDAY:
+        return "holiday"
+
+    if not shift and not cint(mark_without_shift):
+        return "unassigned"
+
+    return MARK_ABSENT
@@ -0,0 +1,225 @@
+"""
+Bank advice (salary disbursement) export
+
+Writes one record per submitted Salary Slip of a period with the amount to
+transfer (net_salary or cash_in_hand), as CSV or fixed-width:
+
+    CSV           header line, one line per slip, TRAILER line
+    Fixed width   H record, one D record per slip, T record
+
+The trailer holds the record count, the total in paise and the SHA-256 of
+the detail records, so the bank (or anyone) can check the file.
+
+Slips are read through an unbuffered (server-side) cursor and written line
+by line, so memory stays flat whatever the number of slips. Rows are ordered
+by slip name and nothing time dependent is written: exporting the same
+period twice gives the same bytes.
+
+An export covers one company in the caller's scope and runs as a background
+job; the file is announced over realtime (`bank_advice_ready`).
+"""
+
+import csv
+import hashlib
+import io
+
+import frappe
+from frappe import _
+from frappe.utils import flt, getdate
+
+from saral_hr.permission import check_company_scope
+
+BANK_ADVICE_AMOUNT_FIELDS = ("net_salary", "cash_in_hand")
+BANK_ADVICE_FORMATS = ("CSV", "Fixed Width")
+
+CSV_HEADER = ["salary_slip", "employee", "employee_name", "bank_account", "amount"]
+
+# (field, width) of a fixed-width D record after the record type
+FIXED_WIDTH_LAYOUT = (
+    ("salary_slip", 20),
+    ("employee", 20),
+    ("employee_name", 40),
+    ("bank_account", 20),
+    ("amount", 15),
+)
+
+
+@frappe.whitelist()
+def export_bank_advice(from_date, to_date, company, amount_field="net_salary", file_format="CSV"):
+    """Queue the bank advice of a company and period"""
+    frappe.has_permission("Salary Slip", "export", throw=True)
+
+    if not company:
+        frappe.throw(_("Company is required"))
+
+    check_company_scope(company)
+
+    if amount_field not in BANK_ADVICE_AMOUNT_FIELDS:
+        frappe.throw(_("Amount must be one of {0}").format(", ".join(BANK_ADVICE_AMOUNT_FIELDS)))
+
+    if file_format not in BANK_ADVICE_FORMATS:
+        frappe.throw(_("Format must be one of {0}").format(", ".join(BANK_ADVICE_FORMATS)))
+
+    from_date = str(getdate(from_date))
+    to_date = str(getdate(to_date))
+
+    frappe.enqueue(
+        "saral_hr.bank_advice.build_bank_advice",
+        queue="long",
+        from_date=from_date,
+        to_date=to_date,
+        company=company,
+        amount_field=amount_field,
+        file_format=file_format,
+        user=frappe.session.user,
+        job_id=f"saral_hr:bank_advice:{company}:{from_date}:{to_date}:{amount_field}:{file_format}",
+        deduplicate=True,
+    )
+
+    return _("Bank advice queued, you will be notified when the file is ready")
+
+
+def build_bank_advice(from_date, to_date, company, amount_field="net_salary", file_format="CSV", user=None):
+    """Write the bank advice to a private File owned by `user` and announce its URL and totals"""
+    user = user or frappe.session.user
+    from_date = getdate(from_date)
+    to_date = getdate(to_date)
+
+    file_name = "bank_advice_{0}_{1}_{2}_{3}.{4}".format(
+        frappe.scrub(company),
+        from_date.strftime("%Y%m%d"),
+        to_date.strftime("%Y%m%d"),
+        amount_field,
+        "csv" if file_format == "CSV" else "txt",
+    )
+
+    with open(frappe.get_site_path("private", "files", file_name), "w", encoding="utf-8", newline="") as f:
+        stats = write_bank_advice(f, from_date, to_date, company, amount_field, file_format)
+
+    file_url = f"/private/files/{file_name}"
+    existing = frappe.db.exists("File", {"file_url": file_url})
+
+    if existing:
+        frappe.db.set_value("File", existing, "owner", user, update_modified=False)
+    else:
+        frappe.get_doc({
+            "doctype": "File",
+            "owner": user,
+            "file_name": file_name,
+            "file_url": file_url,
+            "is_private": 1,
+        }).insert(ignore_permissions=True)
+
+    frappe.db.commit()
+
+    stats.file_url = file_url
+    frappe.publish_realtime("bank_advice_ready", stats, user=user)
+
+    return stats
+
+
+def write_bank_advice(f, from_date, to_date, company, amount_field="net_salary", file_format="CSV"):
+    """
+    Stream the bank advice into the text file `f` and return
+    {records, total, checksum, missing_account}
+    """
+    stats = frappe._dict(records=0, total=0.0, checksum="", missing_account=0)
+    checksum = hashlib.sha256()
+    total_paise = 0
+
+    format_line = format_csv_line if file_format == "CSV" else format_fixed_width_line
+
+    f.write(get_header(file_format, from_date, to_date, company))
+
+    for slip, employee, employee_name, bank_account, amount in get_bank_advice_rows(
+        from_date, to_date, company, amount_field
+    ):
+        paise = round(flt(amount, 2) * 100)
+        line = format_line({
+            "salary_slip": slip,
+            "employee": employee,
+            "employee_name": employee_name or "",
+            "bank_account": bank_account or "",
+            "amount": paise,
+        })
+
+        f.write(line)
+        checksum.update(line.encode("utf-8"))
+
+        stats.records += 1
+        total_paise += paise
+        if not bank_account:
+            stats.missing_account += 1
+
+    stats.total = total_paise / 100
+    stats.checksum = checksum.hexdigest()
+
+    f.write(get_trailer(file_format, stats.records, total_paise, stats.checksum))
+
+    return stats
+
+
+def get_bank_advice_rows(from_date, to_date, company, amount_field):
+    """Yield (slip, employee, employee_name, bank_account, amount) from a server-side cursor"""
+    with frappe.db.unbuffered_cursor():
+        yield from frappe.db.sql(f"""
+            SELECT
+                ss.name,
+                ss.employee,
+                ss.employee_name,
+                e.bank_account_details,
+                ss.`{amount_field}`
+            FROM `tabSalary Slip` ss
+            LEFT JOIN `tabCompany Link` cl ON cl.name = ss.employee
+            LEFT JOIN `tabEmployee` e ON e.name = cl.employee
+            WHERE ss.docstatus = 1
+                AND ss.company = %(company)s
+                AND ss.start_date BETWEEN %(from_date)s AND %(to_date)s
+            ORDER BY ss.name
+        """, {
+            "from_date": from_date,
+            "to_date": to_date,
+            "company": company,
+        }, as_iterator=True)
+
+
+# ----------------------------------------------------------------------
+# Formats
+# ----------------------------------------------------------------------
+def format_amount(paise):
+    return f"{paise // 100}.{paise % 100:02d}" if paise >= 0 else "-" + format_amount(-paise)
+
+
+def format_csv_line(row):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(
+        [format_amount(row[field]) if field == "amount" else row[field] for field in CSV_HEADER]
+    )
+    return buffer.getvalue()
+
+
+def format_fixed_width_line(row):
+    line = "D"
+    for field, width in FIXED_WIDTH_LAYOUT:
+        if field == "amount":
+            line += f"{row[field]:0{width}d}"
+        else:
+            line += str(row[field]).replace("\n", " ")[:width].ljust(width)
+
+    return line + "\n"
+
+
+def get_header(file_format, from_date, to_date, company):
+    if file_format == "CSV":
+        return ",".join(CSV_HEADER) + "\n"
+
+    return "H{0}{1}{2}\n".format(
+        company.ljust(40)[:40], from_date.strftime("%Y%m%d"), to_date.strftime("%Y%m%d")
+    )
+
+
+def get_trailer(file_format, records, total_paise, checksum):
+    if file_format == "CSV":
+        return f"TRAILER,{records},{format_amount(total_paise)},{checksum}\n"
+
+    return f"T{records:010d}{total_paise:018d}{checksum}\n"
@@ -0,0 +1,56 @@
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-payroll-register")
+@click.option("--company", help="Only rebuild the register of this company")
+@pass_context
+def rebuild_payroll_register(context, company=None):
+    """Recompute the Payroll Register Summary from submitted Salary Slips"""
+    import frappe
+
+    from saral_hr.saral_hr.doctype.payroll_register_summary.payroll_register_summary import (
+        rebuild_payroll_register,
+    )
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+
+    try:
+        rebuild_payroll_register(company)
+        frappe.db.commit()
+    finally:
+        frappe.destroy()
+
+
+@click.command("revalidate-salary-structures")
+@pass_context
+def revalidate_salary_structures(context):
+    """Check every Salary Structure and Assignment against the current component types"""
+    import frappe
+    from frappe.utils import strip_html
+
+    from saral_hr.saral_hr.doctype.salary_structure.salary_structure import (
+        revalidate_salary_structures,
+    )
+
+    frappe.init(site=get_site(context))
+    frappe.connect()
+
+    try:
+        invalid = revalidate_salary_structures()
+    finally:
+        frappe.destroy()
+
+    for (doctype, name), errors in sorted(invalid.items()):
+        click.echo(f"{doctype} {name}")
+        for error in errors:
+            click.echo(f"    {strip_html(error)}")
+
+    click.secho(f"{len(invalid)} invalid document(s)", fg="red" if invalid else "green")
+
+    if invalid:
+        raise SystemExit(1)
+
+
+commands = [rebuild_payroll_register, revalidate_salary_structures]
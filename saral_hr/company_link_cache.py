@@ -0,0 +1,104 @@
+"""
+Company Link attribute cache
+
+Validators and APIs need the same few attributes of a Company Link
+(company, is_active, date_of_joining, weekly_off, aadhar_number, ...) over
+and over. They are read here through two levels:
+
+- a request-local dict, so a request asks for a Company Link at most once
+- a Redis hash (one field per Company Link), shared by all workers
+
+`get_many` reads a whole set with one HMGET, one query for the links found
+in neither level and one pipelined write back. Links that do not exist are
+cached as empty too.
+
+Entries are dropped when the Company Link is updated or deleted, and when
+Employee changes rewrite the copied full_name / aadhar_number.
+"""
+
+import pickle
+
+import frappe
+
+COMPANY_LINK_CACHE_KEY = "saral_hr:company_link"
+
+COMPANY_LINK_CACHED_FIELDS = (
+    "name",
+    "employee",
+    "full_name",
+    "aadhar_number",
+    "company",
+    "department",
+    "is_active",
+    "date_of_joining",
+    "left_date",
+    "weekly_off",
+)
+
+
+def get_company_link(name):
+    """Cached attributes of a Company Link as a dict, None if it does not exist"""
+    if not name:
+        return None
+
+    return get_many([name]).get(name)
+
+
+def get_many(names):
+    """{name: attributes} of the Company Links that exist among `names`"""
+    local_cache = get_local_cache()
+    names = [name for name in dict.fromkeys(names or []) if name]
+
+    missing = [name for name in names if name not in local_cache]
+
+    if missing:
+        cache = frappe.cache()
+        redis_key = cache.make_key(COMPANY_LINK_CACHE_KEY)
+        not_cached = []
+
+        # raw HMGET: values are pickled the way RedisWrapper.hset stores them
+        for name, value in zip(missing, cache.hmget(redis_key, missing)):
+            if value is None:
+                not_cached.append(name)
+            else:
+                local_cache[name] = pickle.loads(value)
+
+        if not_cached:
+            fetched = {name: {} for name in not_cached}
+
+            for link in frappe.get_all(
+                "Company Link",
+                filters={"name": ["in", not_cached]},
+                fields=list(COMPANY_LINK_CACHED_FIELDS),
+            ):
+                fetched[link.name] = link
+
+            pipeline = cache.pipeline()
+            for name, link in fetched.items():
+                pipeline.hset(redis_key, name, pickle.dumps(link))
+            pipeline.execute()
+
+            local_cache.update(fetched)
+
+    return {name: frappe._dict(local_cache[name]) for name in names if local_cache[name]}
+
+
+def get_local_cache():
+    if not hasattr(frappe.local, "company_link_cache"):
+        frappe.local.company_link_cache = {}
+
+    return frappe.local.company_link_cache
+
+
+def clear_company_link_cache(names=None):
+    """Drop the given Company Links (all of them by default) from both levels"""
+    local_cache = get_local_cache()
+
+    if names is None:
+        local_cache.clear()
+        frappe.cache().delete_value(COMPANY_LINK_CACHE_KEY)
+        return
+
+    for name in names:
+        local_cache.pop(name, None)
+        frappe.cache().hdel(COMPANY_LINK_CACHE_KEY, name)
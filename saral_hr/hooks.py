@@ -70,6 +70,34 @@ permission_query_conditions = {
     "Attendance": "saral_hr.permission.attendance_permission_query",
 }
 
+doc_events = {
+    "User Permission": {
+        "on_update": "saral_hr.permission.clear_company_scope_cache",
+        "on_trash": "saral_hr.permission.clear_company_scope_cache",
+    },
+    "User": {
+        "on_update": "saral_hr.permission.clear_company_scope_cache",
+    },
+    "Employee": {
+        "on_update": "saral_hr.roster.bump_roster_version",
+        "on_trash": "saral_hr.roster.bump_roster_version",
+    },
+    "Company Link": {
+        "on_update": [
+            "saral_hr.roster.bump_roster_version",
+            "saral_hr.www.employee_timeline.index.clear_employee_timeline_cache",
+        ],
+        "on_trash": [
+            "saral_hr.roster.bump_roster_version",
+            "saral_hr.www.employee_timeline.index.clear_employee_timeline_cache",
+        ],
+    },
+    "Salary Slip": {
+        "on_submit": "saral_hr.saral_hr.doctype.payroll_register_summary.payroll_register_summary.on_salary_slip_submit",
+        "on_cancel": "saral_hr.saral_hr.doctype.payroll_register_summary.payroll_register_summary.on_salary_slip_cancel",
+    },
+}
+
 
 # Generators
 # ----------
@@ -173,6 +201,12 @@ permission_query_conditions = {
 # 	],
 # }
 
+scheduler_events = {
+    "daily": [
+        "saral_hr.auto_attendance.daily"
+    ],
+}
+
 # Testing
 # -------
 
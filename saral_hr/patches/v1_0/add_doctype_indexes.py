@@ -0,0 +1,27 @@
+import frappe
+
+from saral_hr.patches.v1_0 import dedupe_active_company_links, dedupe_attendance
+
+# doctypes whose on_doctype_update adds indexes or unique constraints
+INDEXED_DOCTYPES = (
+    "saral_hr.saral_hr.doctype.attendance.attendance",
+    "saral_hr.saral_hr.doctype.company_link.company_link",
+    "saral_hr.saral_hr.doctype.employee.employee",
+    "saral_hr.saral_hr.doctype.payroll_register_summary.payroll_register_summary",
+    "saral_hr.saral_hr.doctype.salary_structure_assignment.salary_structure_assignment",
+    "saral_hr.saral_hr.doctype.shift_assignment.shift_assignment",
+)
+
+
+def execute():
+    """
+    Indexes and unique constraints of existing sites. on_doctype_update only
+    runs when a DocType is re-imported, so it is called here for each of them;
+    add_index / add_unique skip the ones that already exist.
+    """
+    # rows written since the pre-sync dedupes would break the unique indexes
+    dedupe_attendance.execute()
+    dedupe_active_company_links.execute()
+
+    for module in INDEXED_DOCTYPES:
+        frappe.get_attr(f"{module}.on_doctype_update")()
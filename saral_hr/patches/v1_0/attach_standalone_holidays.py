@@ -0,0 +1,79 @@
+import frappe
+
+from saral_hr.working_calendar import clear_working_calendar_cache
+
+
+def execute():
+    """
+    Holiday used to be a standalone doctype and is now the `holidays` table
+    of Holiday List. Copy every standalone Holiday into each Holiday List
+    whose period covers its date, then drop the copied originals. Holidays
+    outside every list period have no list to go to and are left untouched.
+    """
+    standalone = frappe.db.sql("""
+        SELECT name, holiday_date, weekly_off, description
+        FROM `tabHoliday`
+        WHERE IFNULL(parent, '') = ''
+    """, as_dict=True)
+
+    if not standalone:
+        return
+
+    holiday_lists = frappe.get_all(
+        "Holiday List",
+        filters={"from_date": ["is", "set"], "to_date": ["is", "set"]},
+        fields=["name", "from_date", "to_date"],
+    )
+
+    existing = {
+        (d.parent, d.holiday_date)
+        for d in frappe.get_all(
+            "Holiday",
+            filters={"parenttype": "Holiday List"},
+            fields=["parent", "holiday_date"],
+        )
+    }
+
+    attached = set()
+    updated_lists = set()
+
+    for holiday in standalone:
+        for holiday_list in holiday_lists:
+            if not (holiday_list.from_date <= holiday.holiday_date <= holiday_list.to_date):
+                continue
+
+            attached.add(holiday.name)
+
+            if (holiday_list.name, holiday.holiday_date) in existing:
+                continue
+
+            frappe.get_doc({
+                "doctype": "Holiday",
+                "parent": holiday_list.name,
+                "parenttype": "Holiday List",
+                "parentfield": "holidays",
+                "holiday_date": holiday.holiday_date,
+                "weekly_off": holiday.weekly_off,
+                "description": holiday.description,
+            }).db_insert()
+
+            existing.add((holiday_list.name, holiday.holiday_date))
+            updated_lists.add(holiday_list.name)
+
+    if attached:
+        frappe.db.delete("Holiday", {"name": ["in", list(attached)]})
+
+    for holiday_list in updated_lists:
+        rows = frappe.get_all(
+            "Holiday",
+            filters={"parent": holiday_list, "parenttype": "Holiday List"},
+            order_by="holiday_date asc",
+            pluck="name",
+        )
+
+        for idx, name in enumerate(rows, start=1):
+            frappe.db.set_value("Holiday", name, "idx", idx, update_modified=False)
+
+        frappe.db.set_value("Holiday List", holiday_list, "total_holidays", len(rows), update_modified=False)
+
+    clear_working_calendar_cache()
@@ -0,0 +1,11 @@
+import frappe
+
+
+def execute():
+    """Fill Attendance.company from the linked Company Link"""
+    frappe.db.sql("""
+        UPDATE `tabAttendance` att
+        INNER JOIN `tabCompany Link` cl ON cl.name = att.employee
+        SET att.company = cl.company
+        WHERE IFNULL(att.company, '') != IFNULL(cl.company, '')
+    """)
@@ -0,0 +1,12 @@
+import frappe
+
+
+def execute():
+    """Employee.display_label is set on save; existing rows are filled by a background job"""
+    frappe.enqueue(
+        "saral_hr.saral_hr.doctype.employee.employee.backfill_display_labels",
+        queue="long",
+        job_id="saral_hr:backfill_display_labels",
+        deduplicate=True,
+        enqueue_after_commit=True,
+    )
@@ -0,0 +1,34 @@
+import frappe
+
+from saral_hr.company_link_cache import clear_company_link_cache
+
+
+def execute():
+    """
+    Keep one active Company Link per employee before the unique index on
+    active_employee is added: the latest joining (then the most recently
+    modified) link stays active, the others are deactivated.
+    """
+    if not frappe.db.table_exists("Company Link"):
+        return
+
+    frappe.db.sql("""
+        UPDATE `tabCompany Link` dup
+        INNER JOIN `tabCompany Link` kept
+            ON kept.employee = dup.employee
+            AND kept.is_active = 1
+            AND (
+                COALESCE(kept.date_of_joining, '1900-01-01') > COALESCE(dup.date_of_joining, '1900-01-01')
+                OR (
+                    COALESCE(kept.date_of_joining, '1900-01-01') = COALESCE(dup.date_of_joining, '1900-01-01')
+                    AND (
+                        kept.modified > dup.modified
+                        OR (kept.modified = dup.modified AND kept.name > dup.name)
+                    )
+                )
+            )
+        SET dup.is_active = 0
+        WHERE dup.is_active = 1
+    """)
+
+    clear_company_link_cache()
@@ -0,0 +1,22 @@
+import frappe
+
+
+def execute():
+    """
+    Keep one Attendance per (employee, attendance_date) before the unique
+    index is added: the most recently modified row wins.
+    """
+    if not frappe.db.table_exists("Attendance"):
+        return
+
+    frappe.db.sql("""
+        DELETE dup
+        FROM `tabAttendance` dup
+        INNER JOIN `tabAttendance` kept
+            ON kept.employee = dup.employee
+            AND kept.attendance_date = dup.attendance_date
+            AND (
+                kept.modified > dup.modified
+                OR (kept.modified = dup.modified AND kept.name > dup.name)
+            )
+    """)
@@ -0,0 +1,7 @@
+from saral_hr.saral_hr.doctype.payroll_register_summary.payroll_register_summary import (
+    rebuild_payroll_register,
+)
+
+
+def execute():
+    rebuild_payroll_register()
@@ -0,0 +1,22 @@
+import frappe
+
+
+def execute():
+    """
+    Salary Slip rows only stored the pro-rated amount so far. Derive the
+    structure amount back so the server side computation does not
+    pro-rate twice.
+    """
+    frappe.db.sql("""
+        UPDATE `tabSalary Details` sd
+        INNER JOIN `tabSalary Slip` ss ON ss.name = sd.parent
+        SET sd.base_amount = CASE
+            WHEN sd.depends_on_payment_days = 1
+                AND ss.payment_days > 0
+                AND ss.total_working_days > 0
+            THEN ROUND(sd.amount * ss.total_working_days / ss.payment_days, 2)
+            ELSE sd.amount
+        END
+        WHERE sd.parenttype = 'Salary Slip'
+            AND IFNULL(sd.base_amount, 0) = 0
+    """)
@@ -0,0 +1,12 @@
+import frappe
+
+
+def execute():
+    """Fill Salary Slip.department from the linked Company Link"""
+    frappe.db.sql("""
+        UPDATE `tabSalary Slip` ss
+        INNER JOIN `tabCompany Link` cl ON cl.name = ss.employee
+        SET ss.department = cl.department
+        WHERE IFNULL(ss.department, '') = ''
+            AND IFNULL(cl.department, '') != ''
+    """)
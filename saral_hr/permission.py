@@ -1,81 +1,121 @@
 import frappe
 
-def company_link_permission_query(user):
-    # System Manager sees everything
-    if "System Manager" in frappe.get_roles(user):
-        return ""
+COMPANY_SCOPE_CACHE_KEY = "saral_hr:company_scope"
 
-    # get allowed companies for user
-    companies = frappe.get_all(
-        "User Permission",
-        filters={
-            "user": user,
-            "allow": "Company"
-        },
-        pluck="for_value"
-    )
 
-    if not companies:
-        return "1=0"
-
-    companies_escaped = ", ".join(
-        frappe.db.escape(c) for c in companies
-    )
+def get_company_scope(user=None):
+    """
+    Resolve the company scope of a user once and cache it per user in Redis
 
-    return f"""
-        `tabCompany Link`.company IN ({companies_escaped})
+    Returns {"all_companies": 0/1, "companies": [...]}:
+    - all_companies: user is a System Manager and sees every company
+    - companies: companies allowed through `User Permission`
     """
-def employee_permission_query(user):
-    if "System Manager" in frappe.get_roles(user):
-        return ""
+    user = user or frappe.session.user
+    cache = frappe.cache()
 
-    companies = frappe.get_all(
-        "User Permission",
-        filters={
-            "user": user,
-            "allow": "Company"
-        },
-        pluck="for_value"
-    )
+    scope = cache.hget(COMPANY_SCOPE_CACHE_KEY, user)
+    if scope is not None:
+        return scope
 
-    if not companies:
-        return "1=0"
+    scope = {
+        "all_companies": 1 if "System Manager" in frappe.get_roles(user) else 0,
+        "companies": frappe.get_all(
+            "User Permission",
+            filters={
+                "user": user,
+                "allow": "Company"
+            },
+            pluck="for_value"
+        ),
+    }
 
-    companies_escaped = ", ".join(
-        frappe.db.escape(c) for c in companies
-    )
+    cache.hset(COMPANY_SCOPE_CACHE_KEY, user, scope)
+    return scope
 
-    return f"""
-        `tabEmployee`.name IN (
-            SELECT cl.employee
-            FROM `tabCompany Link` cl
-            WHERE cl.company IN ({companies_escaped})
+
+def get_allowed_companies(user=None):
+    """Companies the user is restricted to through `User Permission`"""
+    return get_company_scope(user)["companies"]
+
+
+def check_company_scope(company, user=None):
+    """Throw PermissionError if the user is restricted to other companies"""
+    companies = get_allowed_companies(user)
+
+    if companies and company not in companies:
+        frappe.throw(
+            frappe._("Not permitted for company {0}").format(frappe.bold(company)),
+            frappe.PermissionError,
         )
+
+
+def clear_company_scope_cache(doc=None, method=None):
     """
-def attendance_permission_query(user):
-    if "System Manager" in frappe.get_roles(user):
-        return ""
+    doc_events handler for `User Permission` and `User` (roles).
+    Without a doc the scope of every user is dropped.
+    """
+    cache = frappe.cache()
 
-    companies = frappe.get_all(
-        "User Permission",
-        filters={
-            "user": user,
-            "allow": "Company"
-        },
-        pluck="for_value"
-    )
+    if doc is None:
+        cache.delete_value(COMPANY_SCOPE_CACHE_KEY)
+        return
+
+    if doc.doctype != "User Permission":
+        cache.hdel(COMPANY_SCOPE_CACHE_KEY, doc.name)
+        return
+
+    users = {doc.user}
+
+    # a permission moved to another user changes the previous user's scope too
+    previous = doc.get_doc_before_save()
+    if previous:
+        users.add(previous.user)
+
+    for user in filter(None, users):
+        cache.hdel(COMPANY_SCOPE_CACHE_KEY, user)
+
+
+def get_company_condition(user, condition):
+    """
+    Permission query condition for the user's company scope.
+    `condition` is formatted with the escaped company list.
+    """
+    scope = get_company_scope(user)
+
+    # System Manager sees everything
+    if scope["all_companies"]:
+        return ""
 
-    if not companies:
+    if not scope["companies"]:
         return "1=0"
 
     companies_escaped = ", ".join(
-        frappe.db.escape(c) for c in companies
+        frappe.db.escape(c) for c in scope["companies"]
     )
 
-    return f"""
-        `tabAttendance`.employee IN (
-            SELECT cl.name
+    return condition.format(companies=companies_escaped)
+
+
+def company_link_permission_query(user):
+    return get_company_condition(user, """
+        `tabCompany Link`.company IN ({companies})
+    """)
+
+
+def employee_permission_query(user):
+    return get_company_condition(user, """
+        `tabEmployee`.name IN (
+            SELECT cl.employee
             FROM `tabCompany Link` cl
-            WHERE cl.company IN ({companies_escaped})
+            WHERE cl.company IN ({companies})
         )
-    """
+    """)
+
+
+def attendance_permission_query(user):
+    # Attendance.company is kept in sync with the Company Link,
+    # so no join is needed here
+    return get_company_condition(user, """
+        `tabAttendance`.company IN ({companies})
+    """)
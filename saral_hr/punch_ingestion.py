@@ -0,0 +1,375 @@
+"""
+Biometric punch log ingestion
+
+Punch files are CSVs exported by the attendance devices, one punch per line:
+
+    device_id,timestamp[,log_type]
+
+`device_id` is Employee.attendance_device_id and `log_type` (IN / OUT) is
+optional. Files are expected in timestamp order, as devices export them; a
+punch for a date already written (e.g. merged device exports) is skipped
+and counted as out of order.
+
+The file is read as a generator pipeline (rows -> punches -> attendance
+dates -> employee-days -> attendance rows) so memory only holds the days
+still open, whatever the size of the file. A punch after midnight that
+falls in the window of the previous day's night shift belongs to that
+previous day.
+
+Attendance is written with batched upserts. Existing rows (e.g. marked by
+hand) are kept unless the ingestion is run with `overwrite`.
+"""
+
+import csv
+import time
+from datetime import datetime, timedelta
+
+import frappe
+from frappe import _
+from frappe.utils import add_months, cint, flt, get_datetime, get_first_day, get_last_day
+
+from saral_hr.saral_hr.doctype.attendance.attendance import upsert_attendance
+from saral_hr.saral_hr.doctype.shift_assignment.shift_assignment import ShiftResolver
+
+PUNCH_BATCH_SIZE = 2000
+
+# punches up to this long after a night shift's end still count for it
+NIGHT_SHIFT_OUT_WINDOW = timedelta(hours=4)
+
+# fields written on Attendance rows built from punches
+PUNCH_UPDATE_FIELDS = (
+    "status",
+    "shift",
+    "in_time",
+    "out_time",
+    "working_hours",
+    "late_entry",
+    "early_exit",
+)
+
+
+@frappe.whitelist()
+def ingest_punch_file(file_url, overwrite=0):
+    """
+    Queue ingestion of an uploaded punch file; with `overwrite` existing
+    Attendance rows are replaced by the ones built from punches
+    """
+    frappe.has_permission("Attendance", "create", throw=True)
+
+    if cint(overwrite):
+        frappe.has_permission("Attendance", "write", throw=True)
+
+    file_path = frappe.get_doc("File", {"file_url": file_url}).get_full_path()
+
+    frappe.enqueue(
+        "saral_hr.punch_ingestion.ingest_punches",
+        queue="long",
+        timeout=6 * 3600,
+        file_path=file_path,
+        overwrite=cint(overwrite),
+    )
+
+    return _("Punch file queued for ingestion")
+
+
+def ingest_punches(file_path, batch_size=PUNCH_BATCH_SIZE, overwrite=0):
+    """
+    Ingest a punch file and return its run statistics
+
+    Existing Attendance rows are only updated with `overwrite`. Commits
+    after every batch of Attendance rows.
+    """
+    stats = frappe._dict(
+        punches=0, skipped=0, out_of_order=0, attendance=0, seconds=0.0, rows_per_sec=0.0
+    )
+    started = time.monotonic()
+
+    device_map = get_device_employee_map()
+    shift_types = {}
+    update_fields = PUNCH_UPDATE_FIELDS if cint(overwrite) else ()
+    date_resolver = AttendanceDateResolver(list(set(device_map.values())), shift_types)
+
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        punches = read_punches(f, device_map, stats)
+        dated_punches = assign_attendance_dates(punches, date_resolver)
+        days = group_employee_days(dated_punches, stats)
+
+        for batch in batched(days, batch_size):
+            rows = build_attendance_rows(batch, shift_types)
+            upsert_attendance(rows, update_fields=update_fields)
+            frappe.db.commit()
+
+            stats.attendance += len(rows)
+
+    stats.seconds = round(time.monotonic() - started, 3)
+    stats.rows_per_sec = round(stats.punches / stats.seconds, 1) if stats.seconds else 0.0
+
+    frappe.logger("saral_hr").info(
+        "Punch ingestion {0}: {1} punches, {2} skipped ({3} out of order), {4} attendance rows "
+        "in {5}s ({6} rows/sec)".format(
+            file_path, stats.punches, stats.skipped, stats.out_of_order, stats.attendance,
+            stats.seconds, stats.rows_per_sec
+        )
+    )
+
+    return stats
+
+
+def get_device_employee_map():
+    """attendance_device_id -> active Company Link"""
+    return dict(
+        frappe.db.sql("""
+            SELECT e.attendance_device_id, cl.name
+            FROM `tabEmployee` e
+            INNER JOIN `tabCompany Link` cl
+                ON cl.employee = e.name AND cl.is_active = 1
+            WHERE IFNULL(e.attendance_device_id, '') != ''
+        """)
+    )
+
+
+# ----------------------------------------------------------------------
+# Pipeline stages
+# ----------------------------------------------------------------------
+def read_punches(lines, device_map, stats):
+    """Yield (company_link, punch_time, log_type) from CSV lines"""
+    for row in csv.reader(lines):
+        if not row or not row[0].strip() or row[0].strip().lower() == "device_id":
+            continue
+
+        company_link = device_map.get(row[0].strip())
+
+        try:
+            punch_time = get_datetime(row[1].strip())
+        except (IndexError, ValueError):
+            punch_time = None
+
+        if not company_link or not punch_time:
+            stats.skipped += 1
+            continue
+
+        stats.punches += 1
+        log_type = row[2].strip().upper() if len(row) > 2 else ""
+        yield company_link, punch_time, log_type
+
+
+def assign_attendance_dates(punches, date_resolver):
+    """Yield (company_link, attendance_date, punch_time, log_type)"""
+    for company_link, punch_time, log_type in punches:
+        yield (
+            company_link,
+            date_resolver.get_attendance_date(company_link, punch_time),
+            punch_time,
+            log_type,
+        )
+
+
+class AttendanceDateResolver:
+    """
+    Attendance date of a punch: its own date, or the previous day when it
+    falls in the window of a night shift that started the previous day.
+    Shift assignments are loaded one month at a time for every employee.
+    """
+
+    def __init__(self, employees, shift_types):
+        self.employees = employees
+        self.shift_types = shift_types
+        self.months = {}
+
+    def get_attendance_date(self, company_link, punch_time):
+        previous_date = punch_time.date() - timedelta(days=1)
+        shift = self.get_shifts(previous_date).get(company_link, previous_date)
+        shift_type = get_shift_type(shift, self.shift_types) if shift else None
+
+        return get_punch_attendance_date(punch_time, shift_type)
+
+    def get_shifts(self, day):
+        month = get_first_day(day)
+
+        if month not in self.months:
+            # the stream moves forward: only the current and previous months are kept
+            for old_month in [m for m in self.months if m < add_months(month, -1)]:
+                del self.months[old_month]
+
+            self.months[month] = ShiftResolver(self.employees, month, get_last_day(month))
+
+        return self.months[month]
+
+
+def get_punch_attendance_date(punch_time, previous_shift_type=None):
+    """
+    Date a punch counts for, given the shift of the previous day: a night
+    shift (ending at or before its start time) takes the punches until its
+    end plus NIGHT_SHIFT_OUT_WINDOW
+    """
+    punch_date = punch_time.date()
+
+    if previous_shift_type and is_night_shift(previous_shift_type):
+        shift_end = datetime.combine(punch_date, previous_shift_type.end_time)
+
+        if punch_time <= shift_end + NIGHT_SHIFT_OUT_WINDOW:
+            return punch_date - timedelta(days=1)
+
+    return punch_date
+
+
+def is_night_shift(shift_type):
+    return shift_type.end_time <= shift_type.start_time
+
+
+def group_employee_days(punches, stats=None):
+    """
+    Yield (company_link, date, [(punch_time, log_type), ...]) per employee-day
+    from (company_link, attendance_date, punch_time, log_type) punches
+
+    A date is emitted once the stream has moved a full day past it, so only
+    the employee-days of the last two dates are held in memory. A punch for
+    an already emitted date would produce a second, partial employee-day
+    overwriting the first one: it is skipped and counted in `stats`.
+    """
+    open_dates = {}
+    last_closed_date = None
+
+    for company_link, punch_date, punch_time, log_type in punches:
+        if last_closed_date and punch_date <= last_closed_date:
+            if stats is not None:
+                stats.skipped += 1
+                stats.out_of_order += 1
+            continue
+
+        open_dates.setdefault(punch_date, {}).setdefault(company_link, []).append(
+            (punch_time, log_type)
+        )
+
+        for closed_date in sorted(d for d in open_dates if d < punch_date - timedelta(days=1)):
+            last_closed_date = closed_date
+            for closed_link, day_punches in open_dates.pop(closed_date).items():
+                yield closed_link, closed_date, day_punches
+
+    for punch_date in sorted(open_dates):
+        for company_link, day_punches in open_dates[punch_date].items():
+            yield company_link, punch_date, day_punches
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def build_attendance_rows(days, shift_types):
+    """Attendance rows for a batch of employee-days"""
+    shifts = ShiftResolver(
+        [company_link for company_link, _date, _punches in days],
+        min(d for _employee, d, _punches in days),
+        max(d for _employee, d, _punches in days),
+    )
+
+    rows = []
+    for company_link, punch_date, day_punches in days:
+        shift = shifts.get(company_link, punch_date)
+        shift_type = get_shift_type(shift, shift_types) if shift else None
+        rows.append(compute_attendance(company_link, punch_date, day_punches, shift, shift_type))
+
+    return rows
+
+
+def compute_attendance(company_link, punch_date, day_punches, shift=None, shift_type=None):
+    """
+    Pair IN/OUT punches of one employee-day and derive the Attendance row
+
+    Without log types the first punch is IN and the last is OUT.
+    """
+    day_punches = sorted(day_punches)
+    in_time, out_time, working_seconds = pair_punches(day_punches)
+    working_hours = flt(working_seconds / 3600, 2)
+
+    row = {
+        "employee": company_link,
+        "attendance_date": punch_date,
+        "status": "Present",
+        "shift": shift,
+        "in_time": in_time,
+        "out_time": out_time,
+        "working_hours": working_hours,
+        "late_entry": 0,
+        "early_exit": 0,
+    }
+
+    if shift_type:
+        shift_start = datetime.combine(punch_date, shift_type.start_time)
+        shift_end = datetime.combine(punch_date, shift_type.end_time)
+
+        # night shift ending after midnight
+        if is_night_shift(shift_type):
+            shift_end += timedelta(days=1)
+
+        if in_time and in_time > shift_start + timedelta(minutes=shift_type.late_entry_grace or 0):
+            row["late_entry"] = 1
+
+        if out_time and out_time < shift_end - timedelta(minutes=shift_type.early_exit_grace or 0):
+            row["early_exit"] = 1
+
+        if shift_type.half_day_hours and working_hours < shift_type.half_day_hours:
+            row["status"] = "Half Day"
+
+    return row
+
+
+def pair_punches(day_punches):
+    """Return (in_time, out_time, working_seconds) for sorted punches"""
+    if not any(log_type for _time, log_type in day_punches):
+        in_time = day_punches[0][0]
+        out_time = day_punches[-1][0] if len(day_punches) > 1 else None
+        return in_time, out_time, (out_time - in_time).total_seconds() if out_time else 0
+
+    in_time = out_time = open_in = None
+    working_seconds = 0
+
+    for punch_time, log_type in day_punches:
+        if log_type == "IN":
+            in_time = in_time or punch_time
+            open_in = open_in or punch_time
+        elif log_type == "OUT":
+            out_time = punch_time
+            if open_in:
+                working_seconds += (punch_time - open_in).total_seconds()
+                open_in = None
+
+    return in_time, out_time, working_seconds
+
+
+# ----------------------------------------------------------------------
+# Shift Types
+# ----------------------------------------------------------------------
+def get_shift_type(shift, shift_types):
+    """Shift Type timings, memoized in `shift_types` for the run"""
+    if shift not in shift_types:
+        shift_type = frappe.db.get_value(
+            "Shift Type",
+            shift,
+            ["start_time", "end_time", "late_entry_grace", "early_exit_grace", "half_day_hours"],
+            as_dict=True,
+        )
+
+        if shift_type:
+            shift_type.start_time = to_time(shift_type.start_time)
+            shift_type.end_time = to_time(shift_type.end_time)
+
+        shift_types[shift] = shift_type
+
+    return shift_types[shift]
+
+
+def to_time(value):
+    """Time fields come back from MariaDB as timedelta"""
+    if isinstance(value, timedelta):
+        return (datetime.min + value).time()
+
+    return get_datetime(f"2000-01-01 {value}").time()
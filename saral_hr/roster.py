@@ -0,0 +1,32 @@
+"""
+Active roster versioning
+
+The mark_attendance page caches the active roster per company scope and
+hands a version stamp to the client. The stamp lives here so that
+doctypes can bump it without importing the page module.
+"""
+
+import frappe
+
+ROSTER_CACHE_KEY = "saral_hr:active_roster"
+ROSTER_VERSION_KEY = "saral_hr:active_roster_version"
+
+
+def get_roster_version():
+    version = frappe.cache().get_value(ROSTER_VERSION_KEY)
+
+    if not version:
+        version = bump_roster_version()
+
+    return version
+
+
+def bump_roster_version(doc=None, method=None):
+    """doc_events handler for Employee and Company Link"""
+    version = frappe.generate_hash(length=12)
+    cache = frappe.cache()
+
+    cache.set_value(ROSTER_VERSION_KEY, version)
+    cache.delete_value(ROSTER_CACHE_KEY)
+
+    return version
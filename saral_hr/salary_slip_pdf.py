@@ -0,0 +1,200 @@
+"""
+Bulk Salary Slip PDFs
+
+Renders every Salary Slip of a company-month into one ZIP file:
+
+- a process pool renders the PDFs; each worker connects to the site and
+  compiles the print format template once, then only renders slips
+- PDFs are written into the ZIP on disk as the workers finish them, so
+  memory holds a few PDFs at a time whatever the number of slips
+- the run reports pages/sec to size the number of workers
+
+The ZIP is saved as a private File and announced to the user over
+realtime (`salary_slip_pdfs_ready`).
+"""
+
+import multiprocessing
+import os
+import time
+import zipfile
+from io import BytesIO
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate
+from frappe.utils.pdf import get_pdf
+from pypdf import PdfReader
+
+from saral_hr.permission import check_company_scope
+
+SALARY_SLIP_PRINT_FORMAT = "Salary Slip Custom"
+PDF_WORKERS = max((os.cpu_count() or 2) - 1, 1)
+
+# per worker process state, set by init_worker
+_worker = {}
+
+
+@frappe.whitelist()
+def enqueue_salary_slip_pdfs(company, start_date, print_format=None, workers=None, payroll_run=None):
+    """
+    Queue the ZIP of all Salary Slip PDFs of a company-month
+
+    The workers render without a user context, so the company scope and the
+    Payroll Run are checked here, before anything is queued.
+    """
+    frappe.has_permission("Salary Slip", "print", throw=True)
+    check_company_scope(company)
+
+    if payroll_run:
+        frappe.has_permission("Payroll Run", "read", doc=payroll_run, throw=True)
+
+        if frappe.db.get_value("Payroll Run", payroll_run, "company") != company:
+            frappe.throw(_("Payroll Run {0} is not of company {1}").format(payroll_run, company))
+
+    start_date = str(getdate(start_date))
+
+    frappe.enqueue(
+        "saral_hr.salary_slip_pdf.build_salary_slip_zip",
+        queue="long",
+        timeout=6 * 3600,
+        company=company,
+        start_date=start_date,
+        print_format=print_format,
+        workers=workers,
+        payroll_run=payroll_run,
+        user=frappe.session.user,
+        job_id=f"saral_hr:salary_slip_pdfs:{company}:{start_date}",
+        deduplicate=True,
+    )
+
+    return _("Salary Slip PDFs queued, you will be notified when the download is ready")
+
+
+def build_salary_slip_zip(company, start_date, print_format=None, workers=None, payroll_run=None, user=None):
+    """
+    Render the Salary Slips of a company-month into a private ZIP File owned
+    by `user` (the requester) and return the run statistics
+    """
+    user = user or frappe.session.user
+    start_date = getdate(start_date)
+    print_format = print_format or SALARY_SLIP_PRINT_FORMAT
+    workers = cint(workers) or PDF_WORKERS
+
+    stats = frappe._dict(slips=0, pages=0, failed=0, seconds=0.0, pages_per_sec=0.0, file_url=None)
+    started = time.monotonic()
+
+    slips = frappe.get_all(
+        "Salary Slip",
+        filters={"company": company, "start_date": start_date, "docstatus": ["<", 2]},
+        pluck="name",
+        order_by="name asc",
+    )
+
+    file_name = "salary_slips_{0}_{1}.zip".format(
+        frappe.scrub(company), start_date.strftime("%Y_%m")
+    )
+    zip_path = frappe.get_site_path("private", "files", file_name)
+
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zf:
+        for name, pdf, pages in render_salary_slips(slips, print_format, workers):
+            if pdf is None:
+                stats.failed += 1
+                continue
+
+            # PDFs are already compressed
+            zf.writestr(f"{name}.pdf", pdf)
+            stats.slips += 1
+            stats.pages += pages
+
+    stats.seconds = round(time.monotonic() - started, 3)
+    stats.pages_per_sec = round(stats.pages / stats.seconds, 2) if stats.seconds else 0.0
+
+    stats.file_url = save_zip_file(file_name, payroll_run, user)
+
+    frappe.logger("saral_hr").info(
+        "Salary Slip PDFs {0} {1}: {2} slips, {3} pages, {4} failed in {5}s "
+        "({6} pages/sec, {7} workers)".format(
+            company, start_date.strftime("%Y-%m"), stats.slips, stats.pages, stats.failed,
+            stats.seconds, stats.pages_per_sec, workers
+        )
+    )
+
+    frappe.publish_realtime("salary_slip_pdfs_ready", stats, user=user)
+
+    return stats
+
+
+def render_salary_slips(slips, print_format, workers):
+    """Yield (name, pdf, pages) in completion order; pdf is None on failure"""
+    if not slips:
+        return
+
+    # spawn: workers open their own database connection
+    context = multiprocessing.get_context("spawn")
+
+    with context.Pool(
+        processes=min(workers, len(slips)),
+        initializer=init_worker,
+        initargs=(frappe.local.site, print_format),
+    ) as pool:
+        yield from pool.imap_unordered(render_salary_slip, slips, chunksize=8)
+
+
+def save_zip_file(file_name, payroll_run=None, user=None):
+    """
+    File record of the ZIP, owned by the requesting user; a re-run
+    overwrites the same file on disk and hands the record to the new requester
+    """
+    file_url = f"/private/files/{file_name}"
+
+    existing = frappe.db.exists("File", {"file_url": file_url})
+    if existing:
+        frappe.db.set_value("File", existing, "owner", user, update_modified=False)
+        frappe.db.commit()
+        return file_url
+
+    frappe.get_doc({
+        "doctype": "File",
+        "owner": user,
+        "file_name": file_name,
+        "file_url": file_url,
+        "is_private": 1,
+        "attached_to_doctype": "Payroll Run" if payroll_run else None,
+        "attached_to_name": payroll_run,
+    }).insert(ignore_permissions=True)
+
+    frappe.db.commit()
+    return file_url
+
+
+# ----------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------
+def init_worker(site, print_format):
+    """Connect to the site and compile the print format template once"""
+    frappe.init(site=site)
+    frappe.connect()
+
+    pf = frappe.get_doc("Print Format", print_format)
+
+    _worker["template"] = frappe.get_jenv().from_string(pf.html)
+    _worker["style"] = f"<style>{pf.css or ''}</style>"
+    _worker["options"] = {
+        "margin-top": f"{pf.margin_top or 15}mm",
+        "margin-bottom": f"{pf.margin_bottom or 15}mm",
+        "margin-left": f"{pf.margin_left or 15}mm",
+        "margin-right": f"{pf.margin_right or 15}mm",
+    }
+
+
+def render_salary_slip(name):
+    try:
+        doc = frappe.get_doc("Salary Slip", name)
+        html = _worker["style"] + _worker["template"].render({"doc": doc})
+        pdf = get_pdf(html, options=dict(_worker["options"]))
+
+        return name, pdf, len(PdfReader(BytesIO(pdf)).pages)
+    except Exception:
+        frappe.log_error(title=_("Salary Slip PDF failed for {0}").format(name))
+        frappe.db.commit()
+        return name, None, 0
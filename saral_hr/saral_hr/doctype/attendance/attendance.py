@@ -4,14 +4,39 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
+from frappe.model.naming import parse_naming_series
 from frappe.utils import (
 	add_days,
 	cint,
 	getdate,
 	nowdate,
+	now_datetime,
 	format_date,
 )
 
+from saral_hr.company_link_cache import get_company_link, get_many
+from saral_hr.permission import check_company_scope
+from saral_hr.working_calendar import WORKING_DAY, WorkingCalendar
+
+
+ATTENDANCE_NAMING_SERIES = "HR-ATT-.YYYY.-"
+ATTENDANCE_UNIQUE_CONSTRAINT = "unique_employee_attendance_date"
+ATTENDANCE_UPSERT_CHUNK_SIZE = 1000
+ATTENDANCE_VALIDATION_CHUNK_SIZE = 5000
+
+# fields accepted by upsert_attendance
+ATTENDANCE_UPSERT_FIELDS = (
+	"employee",
+	"attendance_date",
+	"status",
+	"shift",
+	"in_time",
+	"out_time",
+	"working_hours",
+	"late_entry",
+	"early_exit",
+)
+
 
 class DuplicateAttendanceError(frappe.ValidationError):
 	pass
@@ -19,11 +44,30 @@ class DuplicateAttendanceError(frappe.ValidationError):
 
 class Attendance(Document):
 
+	def before_insert(self):
+		self.set_company()
+
 	def validate(self):
+		self.set_company()
 		self.validate_attendance_date()
-		self.validate_duplicate_record()
 		self.validate_employee_active()
 
+	# ------------------------------------------------------------------
+	# Company (denormalized from Company Link for permission queries)
+	# ------------------------------------------------------------------
+	def set_company(self):
+		if not self.employee:
+			return
+
+		self.company = self.get_company_link().company
+
+	def get_company_link(self):
+		"""
+		Company Link fields used by the validations, from the Company Link cache
+		"""
+
+		return get_company_link(self.employee) or frappe._dict(name=self.employee)
+
 	# ------------------------------------------------------------------
 	# Attendance Date Validation
 	# ------------------------------------------------------------------
@@ -37,11 +81,7 @@ class Attendance(Document):
 		if not self.employee or not self.attendance_date:
 			return
 
-		date_of_joining = frappe.db.get_value(
-			"Company Link",
-			self.employee,
-			"date_of_joining"
-		)
+		date_of_joining = self.get_company_link().date_of_joining
 
 		# Future date check
 		if (
@@ -66,27 +106,15 @@ class Attendance(Document):
 			)
 
 	# ------------------------------------------------------------------
-	# Duplicate Attendance Validation
+	# Duplicate Attendance (enforced by the unique index)
 	# ------------------------------------------------------------------
-	def validate_duplicate_record(self):
+	def show_unique_validation_message(self, e):
 		"""
-		Ensure only one attendance record per employee per date
+		Ensure only one attendance record per employee per date.
+		Called by db_insert / db_update on a duplicate entry error.
 		"""
 
-		if not self.employee or not self.attendance_date:
-			return
-
-		duplicate = frappe.db.exists(
-			"Attendance",
-			{
-				"employee": self.employee,
-				"attendance_date": self.attendance_date,
-				"docstatus": ["<", 2],
-				"name": ["!=", self.name],
-			},
-		)
-
-		if duplicate:
+		if ATTENDANCE_UNIQUE_CONSTRAINT in str(e):
 			frappe.throw(
 				_(
 					"Attendance for employee {0} is already marked for {1}"
@@ -98,6 +126,8 @@ class Attendance(Document):
 				exc=DuplicateAttendanceError,
 			)
 
+		super().show_unique_validation_message(e)
+
 	# ------------------------------------------------------------------
 	# Active Employee Validation (Company Link)
 	# ------------------------------------------------------------------
@@ -109,11 +139,7 @@ class Attendance(Document):
 		if not self.employee:
 			return
 
-		is_active = frappe.db.get_value(
-			"Company Link",
-			self.employee,
-			"is_active"
-		)
+		is_active = self.get_company_link().is_active
 
 		if not is_active:
 			frappe.throw(
@@ -123,6 +149,352 @@ class Attendance(Document):
 			)
 
 
+def on_doctype_update():
+	frappe.db.add_index("Attendance", ["company", "attendance_date"])
+	frappe.db.add_unique(
+		"Attendance",
+		["employee", "attendance_date"],
+		constraint_name=ATTENDANCE_UNIQUE_CONSTRAINT,
+	)
+
+
+# ======================================================================
+# UNMARKED DAYS
+# ======================================================================
+@frappe.whitelist()
+def get_unmarked_days(employee, from_date, to_date, exclude_holidays=0):
+	"""
+	Return list of days without attendance. With `exclude_holidays` only the
+	working days of the employee's calendar are returned.
+	"""
+
+	frappe.has_permission("Attendance", "read", throw=True)
+
+	company_link = get_company_link(employee)
+	if not company_link:
+		frappe.throw(_("Company Link {0} not found").format(employee), frappe.DoesNotExistError)
+
+	check_company_scope(company_link.company)
+
+	from_date = getdate(from_date)
+	to_date = getdate(to_date)
+
+	marked_days = {
+		getdate(d)
+		for d in frappe.get_all(
+			"Attendance",
+			filters={
+				"employee": employee,
+				"attendance_date": ["between", [from_date, to_date]],
+				"docstatus": ["!=", 2],
+			},
+			pluck="attendance_date",
+		)
+	}
+
+	codes = WorkingCalendar([employee]).get_codes(employee, from_date, to_date)
+	unmarked_days = []
+
+	for i, day_type in enumerate(codes):
+		current = add_days(from_date, i)
+		if current in marked_days:
+			continue
+
+		if not cint(exclude_holidays) or day_type == WORKING_DAY:
+			unmarked_days.append(current)
+
+	return unmarked_days
+
+
+# ======================================================================
+# BULK VALIDATION
+# ======================================================================
+@frappe.whitelist()
+def validate_attendance_rows(rows):
+	"""
+	Set-based counterpart of Attendance.validate for imports.
+
+	Checks every candidate row (dict with employee, attendance_date, status
+	and optionally name) for future dates, joining date, active Company
+	Link and duplicates, using two queries per chunk of rows.
+
+	Returns [{"row": index, "errors": [...]}] for the invalid rows only.
+	"""
+
+	frappe.has_permission("Attendance", "create", throw=True)
+
+	rows = frappe.parse_json(rows) or []
+	invalid = []
+	seen = set()
+
+	for start in range(0, len(rows), ATTENDANCE_VALIDATION_CHUNK_SIZE):
+		chunk = rows[start : start + ATTENDANCE_VALIDATION_CHUNK_SIZE]
+		invalid.extend(_validate_attendance_chunk(chunk, start, seen))
+
+	return invalid
+
+
+def _validate_attendance_chunk(rows, offset, seen):
+	today = getdate(nowdate())
+	employees = list({row.get("employee") for row in rows if row.get("employee")})
+	row_dates = [_parse_attendance_date(row.get("attendance_date")) for row in rows]
+	dates = [d for d in row_dates if d]
+
+	company_links = get_many(employees)
+	existing = {}
+
+	if employees and dates:
+		existing = {
+			(d.employee, getdate(d.attendance_date)): d.name
+			for d in frappe.get_all(
+				"Attendance",
+				filters={
+					"employee": ["in", employees],
+					"attendance_date": ["between", [min(dates), max(dates)]],
+				},
+				fields=["name", "employee", "attendance_date"],
+			)
+		}
+
+	invalid = []
+
+	for idx, (row, attendance_date) in enumerate(zip(rows, row_dates), start=offset):
+		errors = []
+		employee = row.get("employee")
+
+		if row.get("attendance_date") and not attendance_date:
+			errors.append(_("Invalid Attendance Date: {0}").format(row.get("attendance_date")))
+			invalid.append({"row": idx, "errors": errors})
+			continue
+
+		if not employee or not attendance_date or not row.get("status"):
+			errors.append(_("Employee, Attendance Date and Status are mandatory"))
+			invalid.append({"row": idx, "errors": errors})
+			continue
+
+		company_link = company_links.get(employee)
+
+		if row.get("status") != "On Leave" and attendance_date > today:
+			errors.append(
+				_("Attendance cannot be marked for future dates: {0}").format(
+					format_date(attendance_date)
+				)
+			)
+
+		if company_link and company_link.date_of_joining and attendance_date < getdate(
+			company_link.date_of_joining
+		):
+			errors.append(
+				_("Attendance date {0} cannot be before employee's joining date {1}").format(
+					format_date(attendance_date),
+					format_date(company_link.date_of_joining),
+				)
+			)
+
+		if not company_link or not company_link.is_active:
+			errors.append(_("Cannot mark attendance for an inactive employee: {0}").format(employee))
+
+		key = (employee, attendance_date)
+		existing_name = existing.get(key)
+		if key in seen or (existing_name and existing_name != row.get("name")):
+			errors.append(
+				_("Attendance for employee {0} is already marked for {1}").format(
+					employee, format_date(attendance_date)
+				)
+			)
+		seen.add(key)
+
+		if errors:
+			invalid.append({"row": idx, "errors": errors})
+
+	return invalid
+
+
+def _parse_attendance_date(value):
+	"""Date of a row, None when missing or unparseable"""
+	if not value:
+		return None
+
+	try:
+		return getdate(value)
+	except (ValueError, frappe.ValidationError):
+		# getdate reports the bad value as a message too; it is a row error here
+		frappe.clear_last_message()
+		return None
+
+
+# ======================================================================
+# NAMING
+# ======================================================================
+def make_attendance_names(count):
+	"""
+	Reserve `count` consecutive names from the Attendance naming series
+	with a single update of `tabSeries`, for rows written via bulk insert
+	"""
+
+	if count <= 0:
+		return []
+
+	prefix = parse_naming_series(ATTENDANCE_NAMING_SERIES)
+
+	current = frappe.db.sql(
+		"SELECT `current` FROM `tabSeries` WHERE `name` = %s FOR UPDATE",
+		(prefix,),
+	)
+
+	if current and current[0][0] is not None:
+		start = cint(current[0][0])
+		frappe.db.sql(
+			"UPDATE `tabSeries` SET `current` = `current` + %s WHERE `name` = %s",
+			(count, prefix),
+		)
+	else:
+		start = 0
+		frappe.db.sql(
+			"INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)",
+			(prefix, count),
+		)
+
+	return [f"{prefix}{i:05d}" for i in range(start + 1, start + count + 1)]
+
+
+# ======================================================================
+# UPSERT
+# ======================================================================
+def get_attendance_statuses():
+	"""Options of Attendance.status"""
+	return [
+		status for status in (frappe.get_meta("Attendance").get_field("status").options or "").split("\n")
+		if status
+	]
+
+
+def upsert_attendance(rows, update_fields=("status",)):
+	"""
+	Insert-or-update Attendance rows keyed on (employee, attendance_date)
+	with one INSERT ... ON DUPLICATE KEY UPDATE statement per chunk.
+
+	`rows` are dicts with employee, attendance_date, status and optionally
+	any other field of ATTENDANCE_UPSERT_FIELDS. `update_fields` are the
+	fields overwritten when the row already exists; with none, existing rows
+	are left untouched (insert only).
+
+	Validation is skipped, callers are expected to have checked the rows.
+	Returns {(employee, attendance_date): name}.
+	"""
+
+	invalid = set(update_fields) - set(ATTENDANCE_UPSERT_FIELDS)
+	if invalid:
+		frappe.throw(_("Cannot update Attendance fields: {0}").format(", ".join(invalid)))
+
+	# last row wins for the same employee and date
+	unique_rows = {}
+	for row in rows:
+		unique_rows[(row["employee"], getdate(row["attendance_date"]))] = row
+
+	rows = list(unique_rows.values())
+	names = {}
+
+	for i in range(0, len(rows), ATTENDANCE_UPSERT_CHUNK_SIZE):
+		names.update(
+			_upsert_attendance_chunk(rows[i : i + ATTENDANCE_UPSERT_CHUNK_SIZE], update_fields)
+		)
+
+	return names
+
+
+def _upsert_attendance_chunk(rows, update_fields):
+	user = frappe.session.user
+	now = now_datetime()
+
+	employees = list({row["employee"] for row in rows})
+	dates = [getdate(row["attendance_date"]) for row in rows]
+
+	company_links = get_many(employees)
+
+	# reuse existing names so the naming series is only consumed for new rows
+	existing = {
+		(d.employee, getdate(d.attendance_date)): d.name
+		for d in frappe.get_all(
+			"Attendance",
+			filters={
+				"employee": ["in", employees],
+				"attendance_date": ["between", [min(dates), max(dates)]],
+			},
+			fields=["name", "employee", "attendance_date"],
+		)
+	}
+
+	new_names = iter(
+		make_attendance_names(
+			sum(1 for row, d in zip(rows, dates) if (row["employee"], d) not in existing)
+		)
+	)
+
+	columns = [
+		"name",
+		"naming_series",
+		"employee_name",
+		"company",
+		"aadhar_number",
+		*ATTENDANCE_UPSERT_FIELDS,
+		"docstatus",
+		"owner",
+		"modified_by",
+		"creation",
+		"modified",
+	]
+
+	names = {}
+	values = []
+
+	for row, attendance_date in zip(rows, dates):
+		key = (row["employee"], attendance_date)
+		name = existing.get(key) or next(new_names)
+		names[key] = name
+
+		company_link = company_links.get(row["employee"]) or frappe._dict()
+		values.extend([
+			name,
+			ATTENDANCE_NAMING_SERIES,
+			company_link.full_name,
+			company_link.company,
+			company_link.aadhar_number,
+			*(
+				attendance_date if field == "attendance_date" else row.get(field)
+				for field in ATTENDANCE_UPSERT_FIELDS
+			),
+			0,
+			user,
+			user,
+			now,
+			now,
+		])
+
+	placeholders = ", ".join(
+		["(" + ", ".join(["%s"] * len(columns)) + ")"] * len(rows)
+	)
+	if update_fields:
+		updates = ", ".join(
+			f"`{field}` = VALUES(`{field}`)"
+			for field in ("company", *update_fields, "modified", "modified_by")
+		)
+	else:
+		# no-op on the unique key: the existing row keeps every value
+		updates = "`name` = `name`"
+
+	frappe.db.sql(
+		f"""
+		INSERT INTO `tabAttendance` ({", ".join(f"`{c}`" for c in columns)})
+		VALUES {placeholders}
+		ON DUPLICATE KEY UPDATE {updates}
+		""",
+		values,
+	)
+
+	return names
+
+
 # # ======================================================================
 # # BULK ATTENDANCE
 # # ======================================================================
@@ -183,44 +555,6 @@ class Attendance(Document):
 # 	}
 
 
-# # ======================================================================
-# # UNMARKED DAYS
-# # ======================================================================
-# @frappe.whitelist()
-# def get_unmarked_days(employee, from_date, to_date, exclude_holidays=0):
-# 	"""
-# 	Return list of days without attendance
-# 	"""
-
-# 	from_date = getdate(from_date)
-# 	to_date = getdate(to_date)
-
-# 	records = frappe.get_all(
-# 		"Attendance",
-# 		fields=["attendance_date"],
-# 		filters={
-# 			"employee": employee,
-# 			"attendance_date": ["between", [from_date, to_date]],
-# 			"docstatus": ["!=", 2],
-# 		},
-# 	)
-
-# 	marked_days = {getdate(d.attendance_date) for d in records}
-# 	unmarked_days = []
-
-# 	current = from_date
-# 	while current <= to_date:
-# 		if current not in marked_days:
-# 			if cint(exclude_holidays):
-# 				if current.weekday() not in [5, 6]:
-# 					unmarked_days.append(current)
-# 			else:
-# 				unmarked_days.append(current)
-# 		current = add_days(current, 1)
-
-# 	return unmarked_days
-
-
 # # ======================================================================
 # # CALENDAR EVENTS
 # # ======================================================================
@@ -1,9 +1,74 @@
 # Copyright (c) 2026, sj and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from saral_hr.saral_hr.doctype.attendance.attendance import upsert_attendance
+
+TEST_EMPLOYEE = "_Test Attendance Company Link"
+
 
 class TestAttendance(FrappeTestCase):
-	pass
+	def get_attendance(self):
+		return frappe.get_all(
+			"Attendance",
+			filters={"employee": TEST_EMPLOYEE},
+			fields=["name", "attendance_date", "status"],
+			order_by="attendance_date asc",
+		)
+
+	def test_upsert_attendance(self):
+		rows = [
+			{"employee": TEST_EMPLOYEE, "attendance_date": "2026-01-05", "status": "Present"},
+			{"employee": TEST_EMPLOYEE, "attendance_date": "2026-01-06", "status": "Absent"},
+		]
+
+		# insert
+		names = upsert_attendance(rows)
+		attendance = self.get_attendance()
+
+		self.assertEqual(len(attendance), 2)
+		self.assertEqual([d.status for d in attendance], ["Present", "Absent"])
+		self.assertEqual(len(set(names.values())), 2)
+
+		# update keeps the existing names, a new date gets a new one
+		rows[0]["status"] = "Half Day"
+		rows.append({"employee": TEST_EMPLOYEE, "attendance_date": "2026-01-07", "status": "Present"})
+
+		updated_names = upsert_attendance(rows)
+		attendance = self.get_attendance()
+
+		self.assertEqual(len(attendance), 3)
+		self.assertEqual([d.status for d in attendance], ["Half Day", "Absent", "Present"])
+
+		for key, name in names.items():
+			self.assertEqual(updated_names[key], name)
+
+		self.assertNotIn(updated_names[(TEST_EMPLOYEE, frappe.utils.getdate("2026-01-07"))], names.values())
+
+	def test_upsert_attendance_last_row_wins(self):
+		upsert_attendance([
+			{"employee": TEST_EMPLOYEE, "attendance_date": "2026-02-02", "status": "Present"},
+			{"employee": TEST_EMPLOYEE, "attendance_date": "2026-02-02", "status": "Absent"},
+		])
+
+		attendance = self.get_attendance()
+
+		self.assertEqual(len(attendance), 1)
+		self.assertEqual(attendance[0].status, "Absent")
+
+	def test_upsert_attendance_insert_only(self):
+		names = upsert_attendance([
+			{"employee": TEST_EMPLOYEE, "attendance_date": "2026-02-03", "status": "Present"},
+		])
+		modified = frappe.db.get_value("Attendance", list(names.values())[0], "modified")
+
+		upsert_attendance(
+			[{"employee": TEST_EMPLOYEE, "attendance_date": "2026-02-03", "status": "Absent"}],
+			update_fields=(),
+		)
+
+		attendance = frappe.db.get_value("Attendance", list(names.values())[0], ["status", "modified"], as_dict=True)
+		self.assertEqual(attendance.status, "Present")
+		self.assertEqual(attendance.modified, modified)
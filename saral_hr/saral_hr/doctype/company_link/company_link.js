@@ -54,30 +54,25 @@ frappe.ui.form.on("Company Link", {
 
 function check_existing_active_employee(frm) {
 	frappe.call({
-		method: "frappe.client.get_list",
-		args: {
-			doctype: "Company Link",
-			filters: {
-				employee: frm.doc.employee,
-				is_active: 1,
-				name: ["!=", frm.doc.name || ""]
-			},
-			fields: ["name", "company"]
-		},
+		method: "saral_hr.saral_hr.doctype.company_link.company_link.get_active_company_link",
+		args: { employee: frm.doc.employee },
 		callback: function (r) {
-			if (r.message && r.message.length > 0) {
-				frappe.msgprint({
-					title: __("Warning"),
-					indicator: "orange",
-					message: __(
+			const active = r.message;
+			if (!active || (active.name && active.name === frm.doc.name)) {
+				return;
+			}
+
+			frappe.msgprint({
+				title: __("Warning"),
+				indicator: "orange",
+				message: active.name
+					? __(
 						"Employee is already active in company {0} (Record: {1}). "
 						+ "Please deactivate that record first.",
-						[r.message[0].company, r.message[0].name]
+						[active.company, active.name]
 					)
-				});
-			}
+					: __("Employee is already active in another company. Please deactivate that record first.")
+			});
 		}
 	});
 }
-
-
@@ -2,44 +2,82 @@ import frappe
 from frappe.model.document import Document
 from frappe import _
 
+from saral_hr.company_link_cache import clear_company_link_cache
+from saral_hr.permission import get_allowed_companies
+
+ACTIVE_EMPLOYEE_INDEX = "unique_active_employee"
+ACTIVE_COMPANY_LINK_CACHE_KEY = "saral_hr:active_company_link"
+
 
 class CompanyLink(Document):
 
     def validate(self):
-        self.validate_active_employee()
         self.validate_left_date()
 
-    def validate_active_employee(self):
+    def on_update(self):
+        self.update_attendance_company()
+        self.clear_active_company_link_cache()
+        clear_company_link_cache([self.name])
+
+    def on_trash(self):
+        self.clear_active_company_link_cache()
+        clear_company_link_cache([self.name])
+
+    def update_attendance_company(self):
         """
-        An employee can be active in ONLY ONE company at a time
+        Keep the denormalized Attendance.company in sync
         """
-        if not self.employee or not self.is_active:
+        if self.is_new() or not self.has_value_changed("company"):
             return
 
+        frappe.db.sql("""
+            UPDATE `tabAttendance`
+            SET company = %(company)s
+            WHERE employee = %(employee)s
+        """, {
+            "company": self.company,
+            "employee": self.name
+        })
+
+    def show_unique_validation_message(self, e):
+        """
+        An employee can be active in ONLY ONE company at a time: enforced by
+        the unique index on `active_employee`, reported here
+        """
+        if ACTIVE_EMPLOYEE_INDEX not in str(e):
+            return super().show_unique_validation_message(e)
+
         existing_active = frappe.db.sql("""
             SELECT name, company
             FROM `tabCompany Link`
-            WHERE employee = %(employee)s
-              AND is_active = 1
-              AND name != %(name)s
+            WHERE active_employee = %(employee)s
             LIMIT 1
-        """, {
-            "employee": self.employee,
-            "name": self.name or ""
-        })
+        """, {"employee": self.employee})
 
-        if existing_active:
-            frappe.throw(
-                _(
-                    "Employee {0} is already active in company {1} (Record: {2}). "
-                    "Please deactivate the existing record before assigning to another company."
-                ).format(
-                    frappe.bold(self.employee),
-                    frappe.bold(existing_active[0][1]),
-                    frappe.bold(existing_active[0][0])
-                ),
-                title=_("Employee Already Active")
-            )
+        name, company = existing_active[0] if existing_active else ("", "")
+
+        frappe.throw(
+            _(
+                "Employee {0} is already active in company {1} (Record: {2}). "
+                "Please deactivate the existing record before assigning to another company."
+            ).format(
+                frappe.bold(self.employee),
+                frappe.bold(company),
+                frappe.bold(name)
+            ),
+            frappe.UniqueValidationError,
+            title=_("Employee Already Active")
+        )
+
+    def clear_active_company_link_cache(self):
+        employees = {self.employee}
+
+        previous = self.get_doc_before_save()
+        if previous:
+            employees.add(previous.employee)
+
+        for employee in filter(None, employees):
+            frappe.cache().hdel(ACTIVE_COMPANY_LINK_CACHE_KEY, employee)
 
     def validate_left_date(self):
         """
@@ -51,3 +89,57 @@ class CompanyLink(Document):
                 indicator="orange"
             )
             self.is_active = 0
+
+
+def on_doctype_update():
+    # backs the company -> employee lookup of employee_permission_query
+    frappe.db.add_index("Company Link", ["company", "employee"])
+    # employment timelines of a set of employees
+    frappe.db.add_index("Company Link", ["employee", "is_active", "date_of_joining"])
+    add_active_employee_constraint()
+
+
+def add_active_employee_constraint():
+    """
+    One active Company Link per employee: `active_employee` is a generated
+    column holding the employee only while the link is active (NULL
+    otherwise, and NULLs do not collide), with a unique index on it. Not a
+    DocType field, so Frappe never writes it.
+    """
+    if not frappe.db.sql("SHOW COLUMNS FROM `tabCompany Link` LIKE 'active_employee'"):
+        frappe.db.sql_ddl("""
+            ALTER TABLE `tabCompany Link`
+            ADD COLUMN active_employee VARCHAR(140)
+                GENERATED ALWAYS AS (IF(is_active = 1, employee, NULL)) STORED
+        """)
+
+    frappe.db.add_unique("Company Link", ["active_employee"], constraint_name=ACTIVE_EMPLOYEE_INDEX)
+
+
+@frappe.whitelist()
+def get_active_company_link(employee):
+    """
+    Active Company Link of an employee as {name, company}, None if there is
+    none. Cached per employee and cleared when a Company Link of the employee
+    changes. A link outside the user's companies is returned without its
+    name and company.
+    """
+    frappe.has_permission("Company Link", "read", throw=True)
+
+    cache = frappe.cache()
+    link = cache.hget(ACTIVE_COMPANY_LINK_CACHE_KEY, employee)
+
+    if link is None:
+        link = frappe.db.get_value(
+            "Company Link", {"employee": employee, "is_active": 1}, ["name", "company"], as_dict=True
+        ) or {}
+        cache.hset(ACTIVE_COMPANY_LINK_CACHE_KEY, employee, link)
+
+    if not link:
+        return None
+
+    companies = get_allowed_companies(frappe.session.user)
+    if companies and link["company"] not in companies:
+        return {"name": None, "company": None}
+
+    return link
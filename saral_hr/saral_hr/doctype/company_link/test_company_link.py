@@ -1,9 +1,91 @@
 # Copyright (c) 2026, sj and Contributors
 # See license.txt
 
-# import frappe
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from saral_hr.company_link_cache import clear_company_link_cache, get_company_link, get_many
+from saral_hr.saral_hr.doctype.company_link import company_link
+from saral_hr.saral_hr.doctype.company_link.company_link import (
+	ACTIVE_COMPANY_LINK_CACHE_KEY,
+	get_active_company_link,
+)
+
+MISSING_LINKS = ["_Test Missing Company Link 1", "_Test Missing Company Link 2"]
+TEST_EMPLOYEE = "_Test Company Link Employee"
+TEST_COMPANY = "_Test Company Link Company"
+
+
+def make_company_link(name, is_active=1, company=TEST_COMPANY):
+	"""Company Link written without validation, so Employee and Company need not exist"""
+	link = frappe.get_doc({
+		"doctype": "Company Link",
+		"name": name,
+		"employee": TEST_EMPLOYEE,
+		"full_name": TEST_EMPLOYEE,
+		"company": company,
+		"is_active": is_active,
+	})
+	link.db_insert()
+	return link
+
 
 class TestCompanyLink(FrappeTestCase):
-	pass
+	def setUp(self):
+		clear_company_link_cache(MISSING_LINKS)
+
+	def test_get_many_queries(self):
+		# one query for the whole set, then none from the request-local cache
+		with self.assertQueryCount(1):
+			self.assertEqual(get_many(MISSING_LINKS), {})
+
+		with self.assertQueryCount(0):
+			self.assertEqual(get_many(MISSING_LINKS), {})
+			self.assertIsNone(get_company_link(MISSING_LINKS[0]))
+
+	def test_redis_cache_queries(self):
+		get_many(MISSING_LINKS)
+
+		# a new request only has the Redis cache
+		frappe.local.company_link_cache = {}
+
+		with self.assertQueryCount(0):
+			self.assertEqual(get_many(MISSING_LINKS), {})
+
+
+class TestActiveCompanyLink(FrappeTestCase):
+	def setUp(self):
+		frappe.cache().hdel(ACTIVE_COMPANY_LINK_CACHE_KEY, TEST_EMPLOYEE)
+
+	def test_second_active_link_is_rejected(self):
+		make_company_link("_Test Company Link 1")
+
+		with self.assertRaises(frappe.UniqueValidationError):
+			make_company_link("_Test Company Link 2", company="_Test Other Company")
+
+	def test_inactive_links_do_not_collide(self):
+		make_company_link("_Test Company Link 1")
+		make_company_link("_Test Company Link 2", is_active=0)
+		make_company_link("_Test Company Link 3", is_active=0)
+
+	def test_out_of_scope_link_is_masked(self):
+		make_company_link("_Test Company Link 1")
+
+		with patch.object(company_link, "get_allowed_companies", return_value=[]):
+			self.assertEqual(
+				get_active_company_link(TEST_EMPLOYEE),
+				{"name": "_Test Company Link 1", "company": TEST_COMPANY},
+			)
+
+		with patch.object(company_link, "get_allowed_companies", return_value=[TEST_COMPANY]):
+			self.assertEqual(get_active_company_link(TEST_EMPLOYEE)["name"], "_Test Company Link 1")
+
+		# served from the cache, still masked for a user of another company
+		with patch.object(company_link, "get_allowed_companies", return_value=["_Test Other Company"]):
+			self.assertEqual(get_active_company_link(TEST_EMPLOYEE), {"name": None, "company": None})
+
+	def test_no_active_link(self):
+		make_company_link("_Test Company Link 1", is_active=0)
+		self.assertIsNone(get_active_company_link(TEST_EMPLOYEE))
@@ -5,6 +5,24 @@ import frappe
 from frappe.model.document import Document
 from frappe.model.naming import set_name_by_naming_series
 
+from saral_hr.company_link_cache import clear_company_link_cache
+from saral_hr.roster import bump_roster_version
+
+# prefix search of the employee_timeline page, each column has its own index
+EMPLOYEE_SEARCH_FIELDS = ("display_label", "employee", "last_name", "aadhar_number")
+
+DISPLAY_LABEL_BACKFILL_CHUNK = 5000
+
+# same label as get_display_label, computed by the database for the backfill
+DISPLAY_LABEL_SQL = """CONCAT(
+    COALESCE(
+        NULLIF(CONCAT_WS(' ', NULLIF(TRIM(first_name), ''), NULLIF(TRIM(last_name), '')), ''),
+        NULLIF(employee, ''),
+        name
+    ),
+    IF(IFNULL(aadhar_number, '') != '', CONCAT(' (', aadhar_number, ')'), '')
+)"""
+
 class Employee(Document):
     def autoname(self):
         set_name_by_naming_series(self)
@@ -13,3 +31,105 @@ class Employee(Document):
         # Populate Full Name into the actual field "employee"
         name_parts = [self.first_name, self.middle_name, self.last_name]
         self.employee = " ".join(filter(None, name_parts))
+        self.display_label = get_display_label(self)
+
+    def on_update(self):
+        self.sync_company_links()
+
+    def sync_company_links(self):
+        """
+        Keep the fetched Company Link.full_name and aadhar_number in sync
+        """
+        if not (self.has_value_changed("employee") or self.has_value_changed("aadhar_number")):
+            return
+
+        frappe.db.sql("""
+            UPDATE `tabCompany Link`
+            SET full_name = %(full_name)s, aadhar_number = %(aadhar_number)s
+            WHERE employee = %(employee)s
+        """, {
+            "full_name": self.employee,
+            "aadhar_number": self.aadhar_number,
+            "employee": self.name
+        })
+
+        clear_company_link_cache(
+            frappe.get_all("Company Link", filters={"employee": self.name}, pluck="name")
+        )
+
+
+def get_display_label(emp):
+    """First Last (Aadhaar): first and last name, else the full name, with the Aadhaar number"""
+    parts = [part.strip() for part in (emp.get("first_name"), emp.get("last_name")) if part and part.strip()]
+    label = " ".join(parts) or emp.get("employee") or emp.get("name")
+
+    if emp.get("aadhar_number"):
+        label += f" ({emp.get('aadhar_number')})"
+
+    return label
+
+
+def on_doctype_update():
+    for field in EMPLOYEE_SEARCH_FIELDS:
+        frappe.db.add_index("Employee", [field])
+
+
+# ----------------------------------------------------------------------
+# Backfill
+# ----------------------------------------------------------------------
+@frappe.whitelist()
+def enqueue_display_label_backfill():
+    frappe.only_for("System Manager")
+
+    frappe.enqueue(
+        "saral_hr.saral_hr.doctype.employee.employee.backfill_display_labels",
+        queue="long",
+        job_id="saral_hr:backfill_display_labels",
+        deduplicate=True,
+    )
+
+
+def backfill_display_labels(chunk_size=DISPLAY_LABEL_BACKFILL_CHUNK):
+    """
+    Set Employee.display_label and the Company Link name / Aadhaar copies of
+    existing rows, one chunk of employees (by name) per transaction so locks
+    stay short on large tables. Returns the number of employees processed.
+    """
+    processed = 0
+    last_name = ""
+
+    while True:
+        names = frappe.db.sql_list("""
+            SELECT name FROM `tabEmployee`
+            WHERE name > %(last_name)s
+            ORDER BY name
+            LIMIT %(chunk_size)s
+        """, {"last_name": last_name, "chunk_size": chunk_size})
+
+        if not names:
+            break
+
+        frappe.db.sql(f"""
+            UPDATE `tabEmployee`
+            SET display_label = {DISPLAY_LABEL_SQL}
+            WHERE name IN %(names)s
+                AND NOT display_label <=> {DISPLAY_LABEL_SQL}
+        """, {"names": tuple(names)})
+
+        frappe.db.sql("""
+            UPDATE `tabCompany Link` cl
+            INNER JOIN `tabEmployee` e ON e.name = cl.employee
+            SET cl.full_name = e.employee, cl.aadhar_number = e.aadhar_number
+            WHERE e.name IN %(names)s
+                AND NOT (cl.full_name <=> e.employee AND cl.aadhar_number <=> e.aadhar_number)
+        """, {"names": tuple(names)})
+
+        frappe.db.commit()
+        processed += len(names)
+        last_name = names[-1]
+
+    # Company Link names changed behind the doc events
+    clear_company_link_cache()
+    bump_roster_version()
+
+    return processed
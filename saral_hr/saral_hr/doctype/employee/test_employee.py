@@ -1,9 +1,20 @@
 # Copyright (c) 2026, sj and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from saral_hr.saral_hr.doctype.employee.employee import get_display_label
+
 
 class TestEmployee(FrappeTestCase):
-	pass
+	def test_display_label(self):
+		emp = frappe._dict(name="EMP-1", employee="Asha K Rao", first_name=" Asha ", last_name="Rao")
+		self.assertEqual(get_display_label(emp), "Asha Rao")
+
+		emp.aadhar_number = "123412341234"
+		self.assertEqual(get_display_label(emp), "Asha Rao (123412341234)")
+
+	def test_display_label_fallback(self):
+		self.assertEqual(get_display_label(frappe._dict(name="EMP-2", employee="Ravi")), "Ravi")
+		self.assertEqual(get_display_label(frappe._dict(name="EMP-3")), "EMP-3")
@@ -1,9 +1,70 @@
 # Copyright (c) 2026, sj and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
+from frappe import _
 from frappe.model.document import Document
+from frappe.utils import format_date, getdate
+
+from saral_hr.working_calendar import clear_working_calendar_cache, get_weekday_dates
 
 
 class HolidayList(Document):
-	pass
+
+	def validate(self):
+		self.validate_holiday_dates()
+		self.holidays.sort(key=lambda d: getdate(d.holiday_date))
+		for i, d in enumerate(self.holidays, start=1):
+			d.idx = i
+
+		self.total_holidays = len(self.holidays)
+
+	def on_update(self):
+		clear_working_calendar_cache()
+
+	def on_trash(self):
+		clear_working_calendar_cache()
+
+	def validate_holiday_dates(self):
+		if self.from_date and self.to_date and getdate(self.from_date) > getdate(self.to_date):
+			frappe.throw(_("From Date cannot be after To Date"))
+
+		seen = set()
+		for d in self.holidays:
+			holiday_date = getdate(d.holiday_date)
+
+			if self.from_date and self.to_date and not (
+				getdate(self.from_date) <= holiday_date <= getdate(self.to_date)
+			):
+				frappe.throw(
+					_("Row {0}: Holiday {1} is outside the Holiday List period").format(
+						d.idx, frappe.bold(format_date(holiday_date))
+					)
+				)
+
+			if holiday_date in seen:
+				frappe.throw(
+					_("Row {0}: Holiday {1} is added more than once").format(
+						d.idx, frappe.bold(format_date(holiday_date))
+					)
+				)
+
+			seen.add(holiday_date)
+
+	@frappe.whitelist()
+	def get_weekly_off_dates(self):
+		"""Add every `weekly_off` day of the period to the holidays"""
+		if not (self.from_date and self.to_date and self.weekly_off):
+			frappe.throw(_("Please set From Date, To Date and Weekly Off"))
+
+		existing = {getdate(d.holiday_date) for d in self.holidays}
+
+		for holiday_date in get_weekday_dates(self.from_date, self.to_date, self.weekly_off):
+			if holiday_date not in existing:
+				self.append("holidays", {
+					"holiday_date": holiday_date,
+					"weekly_off": 1,
+					"description": _(self.weekly_off),
+				})
+
+		self.weekly_off = ""
@@ -1,9 +1,32 @@
 # Copyright (c) 2026, sj and Contributors
 # See license.txt
 
-# import frappe
+from datetime import date
+
 from frappe.tests.utils import FrappeTestCase
 
+from saral_hr.working_calendar import compile_calendar, day_of_year, get_weekday_dates
+
 
 class TestHolidayList(FrappeTestCase):
-	pass
+	def test_weekly_offs(self):
+		codes = compile_calendar(2026, "Sunday")
+
+		self.assertEqual(len(codes), 365)
+		self.assertEqual(codes.count("O"), 52)
+		# 4th January 2026 is a Sunday
+		self.assertEqual(codes[:7], "WWWOWWW")
+
+	def test_several_weekly_offs_in_leap_year(self):
+		codes = compile_calendar(2028, "Saturday, Sunday")
+
+		self.assertEqual(len(codes), 366)
+		for i, day_type in enumerate(codes):
+			weekday = date.fromordinal(date(2028, 1, 1).toordinal() + i).weekday()
+			self.assertEqual(day_type, "O" if weekday in (5, 6) else "W")
+
+	def test_weekday_dates(self):
+		dates = get_weekday_dates("2026-01-01", "2026-01-31", "Sunday")
+
+		self.assertEqual([d.day for d in dates], [4, 11, 18, 25])
+		self.assertEqual(day_of_year(dates[0]), 3)
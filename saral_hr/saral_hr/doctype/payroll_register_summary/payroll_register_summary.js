@@ -0,0 +1,8 @@
+// Copyright (c) 2026, sj and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Payroll Register Summary", {
+	refresh(frm) {
+		frm.disable_save();
+	},
+});
@@ -0,0 +1,194 @@
+# Copyright (c) 2026, sj and contributors
+# For license information, please see license.txt
+
+import hashlib
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now
+
+from saral_hr.company_link_cache import get_company_link
+from saral_hr.saral_hr.doctype.salary_slip.salary_slip import (
+	EMPLOYEE_DEDUCTION,
+	EMPLOYER_CONTRIBUTION,
+	RETENTION,
+	get_deduction_kind,
+)
+
+PAYROLL_REGISTER_UNIQUE_CONSTRAINT = "unique_payroll_register_key"
+
+NET_PAY = "Net Pay"
+DEDUCTION_TYPES = {
+	EMPLOYEE_DEDUCTION: "Deduction",
+	EMPLOYER_CONTRIBUTION: "Employer Contribution",
+	RETENTION: "Retention",
+}
+
+
+class PayrollRegisterSummary(Document):
+	pass
+
+
+def on_doctype_update():
+	frappe.db.add_unique(
+		"Payroll Register Summary",
+		["company", "month", "department", "salary_component"],
+		constraint_name=PAYROLL_REGISTER_UNIQUE_CONSTRAINT,
+	)
+
+
+# ----------------------------------------------------------------------
+# Incremental update (Salary Slip doc_events)
+# ----------------------------------------------------------------------
+def on_salary_slip_submit(doc, method=None):
+	update_payroll_register(doc, 1)
+
+
+def on_salary_slip_cancel(doc, method=None):
+	update_payroll_register(doc, -1)
+
+
+def update_payroll_register(slip, sign):
+	"""Add (sign = 1) or remove (sign = -1) one Salary Slip from the register"""
+	company = slip.company or ""
+	month = getdate(slip.start_date).replace(day=1)
+	department = slip.get("department") or (get_company_link(slip.employee) or {}).get("department") or ""
+
+	# {salary_component: [component_type, amount]}, a component counted once per slip
+	components = {}
+
+	for row in slip.get("earnings") or []:
+		components.setdefault(row.salary_component, ["Earning", 0.0])[1] += flt(row.amount)
+
+	for row in slip.get("deductions") or []:
+		component_type = DEDUCTION_TYPES[get_deduction_kind(row)]
+		components.setdefault(row.salary_component, [component_type, 0.0])[1] += flt(row.amount)
+
+	rows = [
+		(company, month, department, salary_component, component_type, amount * sign, sign)
+		for salary_component, (component_type, amount) in components.items()
+	]
+	rows.append((company, month, department, "", NET_PAY, flt(slip.net_salary) * sign, sign))
+
+	upsert_register_rows(rows)
+
+
+def upsert_register_rows(rows):
+	"""
+	Add (company, month, department, salary_component, component_type,
+	amount, headcount) rows to the register in one statement
+	"""
+	timestamp = now()
+	user = frappe.session.user
+
+	values = [
+		(
+			get_register_name(company, month, department, salary_component),
+			timestamp, timestamp, user, user,
+			company, month, department, salary_component, component_type, amount, headcount,
+		)
+		for company, month, department, salary_component, component_type, amount, headcount in rows
+	]
+
+	frappe.db.sql("""
+		INSERT INTO `tabPayroll Register Summary`
+			(name, creation, modified, modified_by, owner,
+			company, month, department, salary_component, component_type, amount, headcount)
+		VALUES {values}
+		ON DUPLICATE KEY UPDATE
+			amount = amount + VALUES(amount),
+			headcount = headcount + VALUES(headcount),
+			modified = VALUES(modified),
+			modified_by = VALUES(modified_by)
+	""".format(values=", ".join(["(" + ", ".join(["%s"] * 12) + ")"] * len(values))),
+		[v for row in values for v in row],
+	)
+
+
+def get_register_name(company, month, department, salary_component):
+	"""Deterministic name of a register row, same as MD5(CONCAT_WS(...)) in rebuild"""
+	key = "|".join([company or "", str(getdate(month)), department or "", salary_component or ""])
+	return hashlib.md5(key.encode()).hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Rebuild
+# ----------------------------------------------------------------------
+@frappe.whitelist()
+def enqueue_rebuild_payroll_register(company=None):
+	frappe.only_for("System Manager")
+
+	frappe.enqueue(
+		"saral_hr.saral_hr.doctype.payroll_register_summary.payroll_register_summary.rebuild_payroll_register",
+		queue="long",
+		timeout=3600,
+		company=company,
+		job_id=f"saral_hr:rebuild_payroll_register:{company or 'all'}",
+		deduplicate=True,
+	)
+
+	return _("Payroll Register rebuild queued")
+
+
+def rebuild_payroll_register(company=None):
+	"""
+	Recompute the register from submitted Salary Slips (of one company, or
+	all). Component types follow get_deduction_kind.
+	"""
+	condition = "AND ss.company = %(company)s" if company else ""
+	params = {"company": company, "now": now(), "user": frappe.session.user}
+
+	if company:
+		frappe.db.delete("Payroll Register Summary", {"company": company})
+	else:
+		frappe.db.delete("Payroll Register Summary")
+
+	frappe.db.sql(f"""
+		INSERT INTO `tabPayroll Register Summary`
+			(name, creation, modified, modified_by, owner,
+			company, month, department, salary_component, component_type, amount, headcount)
+		SELECT
+			MD5(CONCAT_WS('|', company, month, department, salary_component)),
+			%(now)s, %(now)s, %(user)s, %(user)s,
+			company, month, department, salary_component,
+			MAX(component_type), SUM(amount), COUNT(DISTINCT slip)
+		FROM (
+			SELECT
+				IFNULL(ss.company, '') AS company,
+				DATE_FORMAT(ss.start_date, '%%Y-%%m-01') AS month,
+				COALESCE(NULLIF(ss.department, ''), cl.department, '') AS department,
+				sd.salary_component,
+				CASE
+					WHEN sd.parentfield = 'earnings' THEN 'Earning'
+					WHEN sd.employer_contribution = 1 THEN 'Employer Contribution'
+					WHEN sd.deduct_from_cash_in_hand_only = 1
+						AND sd.salary_component = 'Retention' THEN 'Retention'
+					ELSE 'Deduction'
+				END AS component_type,
+				sd.amount,
+				ss.name AS slip
+			FROM `tabSalary Slip` ss
+			INNER JOIN `tabSalary Details` sd
+				ON sd.parent = ss.name
+				AND sd.parenttype = 'Salary Slip'
+				AND sd.parentfield IN ('earnings', 'deductions')
+			LEFT JOIN `tabCompany Link` cl ON cl.name = ss.employee
+			WHERE ss.docstatus = 1 {condition}
+
+			UNION ALL
+
+			SELECT
+				IFNULL(ss.company, ''),
+				DATE_FORMAT(ss.start_date, '%%Y-%%m-01'),
+				COALESCE(NULLIF(ss.department, ''), cl.department, ''),
+				'',
+				'{NET_PAY}',
+				ss.net_salary,
+				ss.name
+			FROM `tabSalary Slip` ss
+			LEFT JOIN `tabCompany Link` cl ON cl.name = ss.employee
+			WHERE ss.docstatus = 1 {condition}
+		) register
+		GROUP BY company, month, department, salary_component
+	""", params)
@@ -0,0 +1,103 @@
+# Copyright (c) 2026, sj and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from saral_hr.saral_hr.doctype.payroll_register_summary.payroll_register_summary import (
+	rebuild_payroll_register,
+	update_payroll_register,
+)
+
+TEST_COMPANY = "_Test Payroll Register Company"
+TEST_DEPARTMENT = "_Test Payroll Register Department"
+
+
+def make_slip(name, start_date, earnings, deductions, net_salary):
+	"""Submitted Salary Slip written without validation, as the register sees it"""
+	slip = frappe.get_doc({
+		"doctype": "Salary Slip",
+		"name": name,
+		"employee": "_Test Payroll Register Link",
+		"company": TEST_COMPANY,
+		"department": TEST_DEPARTMENT,
+		"start_date": start_date,
+		"net_salary": net_salary,
+		"docstatus": 1,
+	})
+	slip.db_insert()
+
+	for parentfield, rows in (("earnings", earnings), ("deductions", deductions)):
+		for idx, (salary_component, amount, employer_contribution) in enumerate(rows, start=1):
+			slip.append(parentfield, {
+				"salary_component": salary_component,
+				"amount": amount,
+				"employer_contribution": employer_contribution,
+				"idx": idx,
+			}).db_insert()
+
+	return slip
+
+
+def get_register():
+	return {
+		(str(row.month), row.salary_component): (row.component_type, row.amount, row.headcount)
+		for row in frappe.get_all(
+			"Payroll Register Summary",
+			filters={"company": TEST_COMPANY},
+			fields=["month", "salary_component", "component_type", "amount", "headcount"],
+		)
+	}
+
+
+class TestPayrollRegisterSummary(FrappeTestCase):
+	def setUp(self):
+		frappe.db.delete("Payroll Register Summary", {"company": TEST_COMPANY})
+
+		self.slips = [
+			make_slip(
+				"_Test Register Slip 1", "2026-01-01",
+				[("Basic", 1000, 0), ("HRA", 400, 0)],
+				[("PF", 120, 0), ("Employer PF", 130, 1)],
+				1280,
+			),
+			make_slip(
+				"_Test Register Slip 2", "2026-01-01",
+				[("Basic", 500, 0)],
+				[("PF", 60, 0)],
+				440,
+			),
+			make_slip(
+				"_Test Register Slip 3", "2026-02-01",
+				[("Basic", 1000, 0)],
+				[],
+				1000,
+			),
+		]
+
+	def test_submit_and_cancel(self):
+		update_payroll_register(self.slips[0], 1)
+		update_payroll_register(self.slips[1], 1)
+
+		register = get_register()
+		self.assertEqual(register[("2026-01-01", "Basic")], ("Earning", 1500, 2))
+		self.assertEqual(register[("2026-01-01", "HRA")], ("Earning", 400, 1))
+		self.assertEqual(register[("2026-01-01", "PF")], ("Deduction", 180, 2))
+		self.assertEqual(register[("2026-01-01", "Employer PF")], ("Employer Contribution", 130, 1))
+		self.assertEqual(register[("2026-01-01", "")], ("Net Pay", 1720, 2))
+
+		update_payroll_register(self.slips[1], -1)
+
+		register = get_register()
+		self.assertEqual(register[("2026-01-01", "Basic")], ("Earning", 1000, 1))
+		self.assertEqual(register[("2026-01-01", "PF")], ("Deduction", 120, 1))
+		self.assertEqual(register[("2026-01-01", "")], ("Net Pay", 1280, 1))
+
+	def test_rebuild_matches_incremental(self):
+		for slip in self.slips:
+			update_payroll_register(slip, 1)
+
+		incremental = get_register()
+		rebuild_payroll_register(TEST_COMPANY)
+
+		self.assertEqual(get_register(), incremental)
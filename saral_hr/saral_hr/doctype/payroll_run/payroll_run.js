@@ -0,0 +1,133 @@
+// Copyright (c) 2026, sj and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on("Payroll Run", {
+	setup(frm) {
+		frappe.realtime.doc_subscribe(frm.doctype, frm.docname);
+		frappe.realtime.on("payroll_run_progress", (data) => {
+			show_progress(frm, data);
+		});
+		frappe.realtime.on("salary_slip_pdfs_ready", (data) => {
+			frappe.msgprint({
+				title: __("Salary Slip PDFs"),
+				indicator: data.failed ? "orange" : "green",
+				message: __("{0} slips, {1} pages ({2} pages/sec), {3} failed. <a href='{4}'>Download ZIP</a>", [
+					data.slips,
+					data.pages,
+					data.pages_per_sec,
+					data.failed,
+					data.file_url
+				])
+			});
+			frm.reload_doc();
+		});
+		frappe.realtime.on("bank_advice_ready", (data) => {
+			frappe.msgprint({
+				title: __("Bank Advice"),
+				indicator: data.missing_account ? "orange" : "green",
+				message: __("{0} records, total {1}, {2} without bank account. <a href='{3}'>Download</a>", [
+					data.records,
+					format_currency(data.total, "INR"),
+					data.missing_account,
+					data.file_url
+				])
+			});
+		});
+	},
+
+	refresh(frm) {
+		if (frm.is_new() || ["Queued", "In Progress"].includes(frm.doc.status)) {
+			return;
+		}
+
+		frm.add_custom_button(__("Start Payroll Run"), () => {
+			frm.call("start").then(() => frm.reload_doc());
+		}).addClass("btn-primary");
+
+		if (frm.doc.processed) {
+			frm.add_custom_button(__("View Salary Slips"), () => {
+				frappe.set_route("List", "Salary Slip", {
+					company: frm.doc.company,
+					start_date: frm.doc.start_date
+				});
+			});
+
+			frm.add_custom_button(__("Download Salary Slip PDFs"), () => {
+				frappe.call({
+					method: "saral_hr.salary_slip_pdf.enqueue_salary_slip_pdfs",
+					args: {
+						company: frm.doc.company,
+						start_date: frm.doc.start_date,
+						payroll_run: frm.doc.name
+					},
+					callback(r) {
+						if (r.message) frappe.show_alert(r.message);
+					}
+				});
+			});
+
+			frm.add_custom_button(__("Bank Advice"), () => export_bank_advice(frm));
+		}
+	},
+
+	start_date(frm) {
+		if (!frm.doc.start_date) return;
+		let start = frappe.datetime.str_to_obj(frm.doc.start_date);
+		let end = new Date(start.getFullYear(), start.getMonth() + 1, 0);
+		frm.set_value("end_date", frappe.datetime.obj_to_str(end));
+	}
+});
+
+function show_progress(frm, data) {
+	if (!data.total) return;
+
+	frm.dashboard.show_progress(
+		__("Salary Slips"),
+		((data.processed + data.failed) / data.total) * 100,
+		__("{0} of {1} processed, {2} failed", [data.processed, data.total, data.failed])
+	);
+
+	if (data.processed + data.failed >= data.total) {
+		frm.reload_doc();
+	}
+}
+
+function export_bank_advice(frm) {
+	frappe.prompt(
+		[
+			{
+				fieldname: "amount_field",
+				label: __("Amount"),
+				fieldtype: "Select",
+				options: [
+					{ value: "net_salary", label: __("Net Salary") },
+					{ value: "cash_in_hand", label: __("Cash in Hand") }
+				],
+				default: "net_salary"
+			},
+			{
+				fieldname: "file_format",
+				label: __("Format"),
+				fieldtype: "Select",
+				options: ["CSV", "Fixed Width"],
+				default: "CSV"
+			}
+		],
+		(values) => {
+			frappe.call({
+				method: "saral_hr.bank_advice.export_bank_advice",
+				args: {
+					from_date: frm.doc.start_date,
+					to_date: frm.doc.end_date,
+					company: frm.doc.company,
+					...values
+				},
+				callback(r) {
+					if (r.message) frappe.show_alert(r.message);
+				}
+			});
+		},
+		__("Bank Advice"),
+		__("Export")
+	);
+}
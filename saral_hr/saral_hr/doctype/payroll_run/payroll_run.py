@@ -0,0 +1,250 @@
+# Copyright (c) 2026, sj and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, get_last_day, getdate, strip_html
+
+from saral_hr.saral_hr.doctype.salary_component.salary_component import get_salary_components
+from saral_hr.saral_hr.doctype.salary_slip.salary_slip import (
+	compute_salary_batch,
+	get_attendance_and_days_bulk,
+)
+from saral_hr.saral_hr.doctype.salary_structure_assignment.salary_structure_assignment import (
+	get_salary_structure_assignments,
+)
+
+PAYROLL_RUN_CHUNK_SIZE = 100
+
+
+class PayrollRun(Document):
+
+	def validate(self):
+		if self.start_date:
+			self.end_date = get_last_day(getdate(self.start_date))
+
+	@frappe.whitelist()
+	def start(self):
+		"""
+		Queue the run. Employees that already have a Salary Slip for the
+		period are skipped, so a failed or partial run can be started again.
+		"""
+
+		if self.status in ("Queued", "In Progress"):
+			frappe.throw(_("Payroll Run {0} is already {1}").format(self.name, self.status))
+
+		self.db_set("status", "Queued")
+
+		frappe.enqueue(
+			"saral_hr.saral_hr.doctype.payroll_run.payroll_run.process_payroll_run",
+			queue="long",
+			timeout=6 * 3600,
+			payroll_run=self.name,
+			job_id=f"saral_hr:payroll_run:{self.name}",
+			deduplicate=True,
+		)
+
+
+# ----------------------------------------------------------------------
+# Background job
+# ----------------------------------------------------------------------
+def process_payroll_run(payroll_run):
+	run = frappe.get_doc("Payroll Run", payroll_run)
+	run.db_set({"status": "In Progress", "failed": 0, "error_log": ""}, commit=True)
+
+	try:
+		status = run_payroll(run)
+	except Exception:
+		frappe.db.rollback()
+		frappe.log_error(title=_("Payroll Run {0} failed").format(run.name))
+		run.db_set("status", "Failed", commit=True)
+		return
+
+	run.db_set("status", status, commit=True)
+
+
+def run_payroll(run):
+	"""Create (and optionally submit) the Salary Slips of a run, in chunks"""
+	employees = get_pending_employees(run)
+	already_done = frappe.db.count(
+		"Salary Slip",
+		{"company": run.company, "start_date": run.start_date, "docstatus": ["<", 2]},
+	)
+
+	total = already_done + len(employees)
+	processed = already_done
+	failed = 0
+	errors = []
+
+	run.db_set({"total_employees": total, "processed": processed}, commit=True)
+	publish_progress(run, total, processed, failed)
+
+	data = get_payroll_data(run, [emp.name for emp in employees])
+
+	for i in range(0, len(employees), PAYROLL_RUN_CHUNK_SIZE):
+		chunk = []
+		for emp in employees[i : i + PAYROLL_RUN_CHUNK_SIZE]:
+			if emp.name in data.assignments:
+				chunk.append((emp, get_slip_input(run, emp, data)))
+			else:
+				failed += 1
+				errors.append(f"{emp.name} ({emp.full_name}): {_('No Salary Structure Assignment in effect for the period')}")
+
+		# one engine pass for the whole chunk
+		totals = compute_salary_batch([slip_input for _emp, slip_input in chunk])
+
+		for (emp, slip_input), slip_totals in zip(chunk, totals):
+			frappe.db.savepoint("payroll_run_slip")
+
+			try:
+				make_salary_slip(run, emp, slip_input, slip_totals)
+				processed += 1
+			except Exception as e:
+				frappe.db.rollback(save_point="payroll_run_slip")
+				failed += 1
+				errors.append(f"{emp.name} ({emp.full_name}): {strip_html(str(e))}")
+			finally:
+				frappe.clear_messages()
+
+		frappe.db.set_value(
+			"Payroll Run",
+			run.name,
+			{"processed": processed, "failed": failed, "error_log": "\n".join(errors)},
+			update_modified=False,
+		)
+		frappe.db.commit()
+		publish_progress(run, total, processed, failed)
+
+	if not failed:
+		return "Completed"
+
+	return "Partially Completed" if processed else "Failed"
+
+
+def publish_progress(run, total, processed, failed):
+	frappe.publish_realtime(
+		"payroll_run_progress",
+		{"total": total, "processed": processed, "failed": failed},
+		doctype="Payroll Run",
+		docname=run.name,
+	)
+
+
+def get_pending_employees(run):
+	"""Active Company Links of the company without a Salary Slip for the period"""
+	return frappe.db.sql("""
+		SELECT cl.name, cl.full_name, cl.company, cl.weekly_off
+		FROM `tabCompany Link` cl
+		WHERE cl.company = %(company)s
+			AND cl.is_active = 1
+			AND (cl.date_of_joining IS NULL OR cl.date_of_joining <= %(end_date)s)
+			AND NOT EXISTS (
+				SELECT 1
+				FROM `tabSalary Slip` ss
+				WHERE ss.employee = cl.name
+					AND ss.start_date = %(start_date)s
+					AND ss.docstatus < 2
+			)
+		ORDER BY cl.name
+	""", {
+		"company": run.company,
+		"start_date": run.start_date,
+		"end_date": run.end_date,
+	}, as_dict=True)
+
+
+# ----------------------------------------------------------------------
+# Bulk prefetch
+# ----------------------------------------------------------------------
+def get_payroll_data(run, employees):
+	"""
+	Everything needed to build the slips, in a fixed number of queries:
+	assignments in effect for the period, their Salary Details rows and
+	attendance days.
+	Components come from the cached registry.
+	"""
+	data = frappe._dict(assignments={}, components={}, days={})
+	if not employees:
+		return data
+
+	data.assignments = get_salary_structure_assignments(
+		run.start_date, run.end_date, employees=employees
+	)
+
+	data.components = get_salary_components()
+
+	data.days = get_attendance_and_days_bulk(
+		run.start_date,
+		employees=employees,
+		deduct_weekly_off=run.deduct_weekly_off_from_working_days,
+	)
+
+	return data
+
+
+# ----------------------------------------------------------------------
+# Salary Slip
+# ----------------------------------------------------------------------
+def get_slip_input(run, emp, data):
+	"""Engine input of one employee: structure rows and payment days"""
+	assignment = data.assignments[emp.name]
+
+	if emp.name not in data.days:
+		frappe.throw(_("No attendance days for Company Link {0}").format(emp.name))
+
+	days = frappe._dict(data.days[emp.name])
+
+	return {
+		"salary_structure": assignment.salary_structure,
+		"days": days,
+		"working_days": days.working_days,
+		"payment_days": days.payment_days,
+		"earnings": [get_component_row(row, data.components) for row in assignment.earnings],
+		"deductions": [get_component_row(row, data.components) for row in assignment.deductions],
+	}
+
+
+def make_salary_slip(run, emp, slip_input, totals):
+	days = slip_input["days"]
+
+	slip = frappe.get_doc({
+		"doctype": "Salary Slip",
+		"employee": emp.name,
+		"employee_name": emp.full_name,
+		"company": emp.company,
+		"salary_structure": slip_input["salary_structure"],
+		"currency": "INR",
+		"start_date": run.start_date,
+		"end_date": run.end_date,
+		"deduct_weekly_off_from_working_days": run.deduct_weekly_off_from_working_days,
+		"total_working_days": days.working_days,
+		"payment_days": days.payment_days,
+		"present_days": days.present_days,
+		"absent_days": days.absent_days,
+		"weekly_offs_count": days.weekly_offs,
+		"earnings": slip_input["earnings"],
+		"deductions": slip_input["deductions"],
+		**totals,
+	})
+	slip.flags.totals_computed = True
+	slip.insert()
+
+	if cint(run.submit_salary_slips):
+		slip.submit()
+
+	return slip
+
+
+def get_component_row(row, components):
+	comp = components.get(row.salary_component) or frappe._dict()
+
+	return {
+		"salary_component": row.salary_component,
+		"abbr": comp.salary_component_abbr,
+		"amount": row.amount,
+		"base_amount": row.amount,
+		"depends_on_payment_days": comp.depends_on_payment_days,
+		"employer_contribution": comp.employer_contribution,
+		"deduct_from_cash_in_hand_only": comp.deduct_from_cash_in_hand_only,
+	}
@@ -0,0 +1,183 @@
+# Copyright (c) 2026, sj and Contributors
+# See license.txt
+
+import copy
+from unittest.mock import MagicMock, patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from saral_hr.saral_hr.doctype.payroll_run import payroll_run
+from saral_hr.saral_hr.doctype.salary_slip.salary_slip import calculate_salary, compute_salary_batch
+
+TEST_COMPANY = "_Test Payroll Run Company"
+
+
+def make_run():
+	run = frappe._dict(
+		name="_Test Payroll Run",
+		company=TEST_COMPANY,
+		start_date="2026-01-01",
+		end_date="2026-01-31",
+		deduct_weekly_off_from_working_days=0,
+		submit_salary_slips=0,
+	)
+	run.db_set = MagicMock()
+	return run
+
+
+def make_employees(*names):
+	return [frappe._dict(name=name, full_name=f"Employee {name}", company=TEST_COMPANY) for name in names]
+
+
+def make_payroll_data(*names):
+	return frappe._dict(
+		assignments={
+			name: frappe._dict(salary_structure="_Test Structure", earnings=[], deductions=[])
+			for name in names
+		},
+		components={},
+		days={
+			name: {"working_days": 31, "payment_days": 31, "present_days": 31, "absent_days": 0, "weekly_offs": 0}
+			for name in names
+		},
+	)
+
+
+class TestPayrollRun(FrappeTestCase):
+	def run_payroll(self, pending, done=0, make_salary_slip=None):
+		"""run_payroll with the queries and Salary Slip creation patched out"""
+		with patch.object(payroll_run, "get_pending_employees", return_value=make_employees(*pending)), \
+			patch.object(payroll_run, "get_payroll_data", return_value=make_payroll_data(*pending)), \
+			patch.object(payroll_run, "make_salary_slip", side_effect=make_salary_slip) as make_slip, \
+			patch.object(payroll_run, "publish_progress"), \
+			patch.object(frappe.db, "count", return_value=done), \
+			patch.object(frappe.db, "set_value") as set_value, \
+			patch.object(frappe.db, "savepoint"), \
+			patch.object(frappe.db, "rollback") as rollback, \
+			patch.object(frappe.db, "commit"):
+			run = make_run()
+			status = payroll_run.run_payroll(run)
+
+		return frappe._dict(
+			status=status,
+			run=run,
+			slips=[c.args[1].name for c in make_slip.call_args_list],
+			progress=set_value.call_args.args[2],
+			rollback=rollback,
+		)
+
+	def test_resume_skips_done_employees(self):
+		result = self.run_payroll(["CL-3", "CL-4"], done=2)
+
+		self.assertEqual(result.status, "Completed")
+		self.assertEqual(result.slips, ["CL-3", "CL-4"])
+		result.run.db_set.assert_any_call({"total_employees": 4, "processed": 2}, commit=True)
+		self.assertEqual(result.progress["processed"], 4)
+		self.assertEqual(result.progress["failed"], 0)
+
+	def test_failure_is_isolated(self):
+		def make_salary_slip(run, emp, slip_input, totals):
+			if emp.name == "CL-2":
+				raise frappe.ValidationError("Missing bank account")
+
+		result = self.run_payroll(["CL-1", "CL-2", "CL-3"], make_salary_slip=make_salary_slip)
+
+		self.assertEqual(result.status, "Partially Completed")
+		self.assertEqual(result.slips, ["CL-1", "CL-2", "CL-3"])
+		result.rollback.assert_called_once_with(save_point="payroll_run_slip")
+		self.assertEqual(result.progress["processed"], 2)
+		self.assertEqual(result.progress["failed"], 1)
+		self.assertIn("CL-2 (Employee CL-2): Missing bank account", result.progress["error_log"])
+
+	def test_all_failed(self):
+		def make_salary_slip(run, emp, slip_input, totals):
+			raise frappe.ValidationError("Missing bank account")
+
+		result = self.run_payroll(["CL-1"], make_salary_slip=make_salary_slip)
+		self.assertEqual(result.status, "Failed")
+
+
+class TestPendingEmployees(FrappeTestCase):
+	def test_employees_with_slips_are_skipped(self):
+		for name in ("_Test PR Link 1", "_Test PR Link 2", "_Test PR Link 3"):
+			frappe.get_doc({
+				"doctype": "Company Link",
+				"name": name,
+				"employee": f"{name} Employee",
+				"full_name": name,
+				"company": TEST_COMPANY,
+				"is_active": 1,
+				"date_of_joining": "2025-01-01",
+			}).db_insert()
+
+		for name, employee, docstatus in (
+			("_Test PR Slip 1", "_Test PR Link 1", 1),
+			("_Test PR Slip 2", "_Test PR Link 2", 2),
+		):
+			frappe.get_doc({
+				"doctype": "Salary Slip",
+				"name": name,
+				"employee": employee,
+				"company": TEST_COMPANY,
+				"start_date": "2026-01-01",
+				"docstatus": docstatus,
+			}).db_insert()
+
+		pending = [emp.name for emp in payroll_run.get_pending_employees(make_run())]
+
+		# a cancelled slip does not count as done
+		self.assertEqual(pending, ["_Test PR Link 2", "_Test PR Link 3"])
+
+
+class TestSalaryEngineParity(FrappeTestCase):
+	def test_batch_matches_single_slip(self):
+		slips = [
+			{
+				"working_days": 30,
+				"payment_days": 27,
+				"earnings": [
+					{"salary_component": "Basic", "amount": 15000, "depends_on_payment_days": 1},
+					{"salary_component": "Conveyance", "amount": 1600, "depends_on_payment_days": 0},
+				],
+				"deductions": [
+					{"salary_component": "PF", "amount": 1800, "depends_on_payment_days": 1},
+					{"salary_component": "Employer PF", "amount": 1800, "employer_contribution": 1},
+					{
+						"salary_component": "Retention",
+						"amount": 500,
+						"deduct_from_cash_in_hand_only": 1,
+					},
+				],
+			},
+			{
+				"working_days": 0,
+				"payment_days": 0,
+				"earnings": [{"salary_component": "Basic", "amount": 9000, "depends_on_payment_days": 1}],
+				"deductions": [],
+			},
+			{
+				"working_days": 31,
+				"payment_days": 31,
+				"earnings": [],
+				"deductions": [{"salary_component": "PF", "amount": 100, "depends_on_payment_days": 1}],
+			},
+		]
+
+		batch = compute_salary_batch(copy.deepcopy(slips))
+		single = [
+			calculate_salary(
+				copy.deepcopy(slip["earnings"]),
+				copy.deepcopy(slip["deductions"]),
+				slip["working_days"],
+				slip["payment_days"],
+			)
+			for slip in slips
+		]
+
+		self.assertEqual(batch, single)
+		self.assertEqual(batch[0]["gross_salary"], 13500 + 1600)
+		self.assertEqual(batch[0]["total_deductions"], 1620)
+		self.assertEqual(batch[0]["total_employer_contribution"], 1800)
+		self.assertEqual(batch[0]["retention"], 500)
+		self.assertEqual(batch[0]["net_salary"], 15100 - 1620)
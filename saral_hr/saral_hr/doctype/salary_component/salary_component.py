@@ -1,9 +1,78 @@
 # Copyright (c) 2026, sj and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
+from frappe.utils.caching import request_cache
+
+SALARY_COMPONENT_FIELDS = [
+	"name",
+	"salary_component_abbr",
+	"type",
+	"depends_on_payment_days",
+	"employer_contribution",
+	"deduct_from_cash_in_hand_only",
+]
+
+SALARY_COMPONENT_CACHE_KEY = "saral_hr:salary_components"
+SALARY_COMPONENT_VERSION_KEY = "saral_hr:salary_components_version"
+
+# in-process layer: site -> (version, components)
+_component_registry = {}
 
 
 class SalaryComponent(Document):
-	pass
+
+	def on_update(self):
+		clear_salary_component_cache()
+
+	def on_trash(self):
+		clear_salary_component_cache()
+
+
+@request_cache
+def get_salary_components():
+	"""
+	Component metadata registry: {name: component}
+
+	Served from the in-process layer while the version stamp in Redis is
+	unchanged, else from Redis, else loaded with one query. The version is
+	read once per request.
+	"""
+
+	cache = frappe.cache()
+	version = cache.get_value(SALARY_COMPONENT_VERSION_KEY)
+
+	local = _component_registry.get(frappe.local.site)
+	if version and local and local[0] == version:
+		return local[1]
+
+	registry = cache.get_value(SALARY_COMPONENT_CACHE_KEY)
+
+	if not version or not registry or registry.get("version") != version:
+		version = version or frappe.generate_hash(length=12)
+		registry = {
+			"version": version,
+			"components": {
+				c.name: c
+				for c in frappe.get_all("Salary Component", fields=SALARY_COMPONENT_FIELDS)
+			},
+		}
+		cache.set_value(SALARY_COMPONENT_VERSION_KEY, version)
+		cache.set_value(SALARY_COMPONENT_CACHE_KEY, registry)
+
+	components = {name: frappe._dict(c) for name, c in registry["components"].items()}
+	_component_registry[frappe.local.site] = (version, components)
+
+	return components
+
+
+def get_salary_component(name):
+	return get_salary_components().get(name) or frappe._dict()
+
+
+def clear_salary_component_cache():
+	"""New version stamp: every process reloads on its next request"""
+	cache = frappe.cache()
+	cache.delete_value(SALARY_COMPONENT_CACHE_KEY)
+	cache.set_value(SALARY_COMPONENT_VERSION_KEY, frappe.generate_hash(length=12))
@@ -27,6 +27,8 @@ frappe.ui.form.on("Salary Slip", {
         if (!frm.doc.start_date) return;
         set_end_date(frm);
         if (!frm.doc.employee) return;
+        // the structure in effect depends on the period
+        fetch_salary(frm);
         fetch_days_and_attendance(frm);
     },
 
@@ -45,7 +47,7 @@ function set_end_date(frm) {
 function fetch_salary(frm) {
     frappe.call({
         method: "saral_hr.saral_hr.doctype.salary_slip.salary_slip.get_salary_structure_for_employee",
-        args: { employee: frm.doc.employee },
+        args: { employee: frm.doc.employee, start_date: frm.doc.start_date },
         callback(r) {
             if (!r.message) {
                 frappe.msgprint("No Salary Structure found");
@@ -1,8 +1,14 @@
 import frappe
+from frappe import _
 from frappe.model.document import Document
-from frappe.utils import getdate, get_last_day
-import calendar
-from datetime import timedelta
+from frappe.utils import cint, flt, getdate, get_last_day, nowdate
+
+from saral_hr.permission import get_allowed_companies
+from saral_hr.saral_hr.doctype.salary_component.salary_component import get_salary_component
+from saral_hr.saral_hr.doctype.salary_structure_assignment.salary_structure_assignment import (
+    get_salary_structure_assignment,
+)
+from saral_hr.working_calendar import HOLIDAY, WEEKLY_OFF, WorkingCalendar
 
 
 class SalarySlip(Document):
@@ -10,32 +16,35 @@ class SalarySlip(Document):
         if self.start_date:
             self.end_date = get_last_day(getdate(self.start_date))
 
+        # bulk payroll computes the whole batch before inserting
+        if not self.flags.totals_computed:
+            self.calculate_totals()
+
+    def calculate_totals(self):
+        """Recompute row amounts and totals on the server"""
+        totals = calculate_salary(
+            self.get("earnings"),
+            self.get("deductions"),
+            self.total_working_days,
+            self.payment_days
+        )
+        self.update(totals)
+
 
 @frappe.whitelist()
-def get_salary_structure_for_employee(employee):
-    ssa = frappe.db.get_all(
-        "Salary Structure Assignment",
-        filters={"employee": employee},
-        fields=["name"],
-        order_by="from_date desc",
-        limit=1
-    )
+def get_salary_structure_for_employee(employee, start_date=None):
+    """Structure rows of the assignment in effect for the month of `start_date`"""
+    start_date = getdate(start_date or nowdate())
+    ssa = get_salary_structure_assignment(employee, start_date, get_last_day(start_date))
 
     if not ssa:
         return None
 
-    ssa_doc = frappe.get_doc("Salary Structure Assignment", ssa[0].name)
-
     earnings = []
     deductions = []
 
-    for row in ssa_doc.earnings:
-        comp = frappe.db.get_value(
-            "Salary Component",
-            row.salary_component,
-            ["salary_component_abbr", "depends_on_payment_days"],
-            as_dict=True
-        )
+    for row in ssa.earnings:
+        comp = get_salary_component(row.salary_component)
 
         earnings.append({
             "salary_component": row.salary_component,
@@ -44,18 +53,8 @@ def get_salary_structure_for_employee(employee):
             "depends_on_payment_days": comp.depends_on_payment_days
         })
 
-    for row in ssa_doc.deductions:
-        comp = frappe.db.get_value(
-            "Salary Component",
-            row.salary_component,
-            [
-                "salary_component_abbr",
-                "employer_contribution",
-                "depends_on_payment_days",
-                "deduct_from_cash_in_hand_only"
-            ],
-            as_dict=True
-        )
+    for row in ssa.deductions:
+        comp = get_salary_component(row.salary_component)
 
         deductions.append({
             "salary_component": row.salary_component,
@@ -67,8 +66,8 @@ def get_salary_structure_for_employee(employee):
         })
 
     return {
-        "salary_structure": ssa_doc.salary_structure,
-        "currency": "INR",
+        "salary_structure": ssa.salary_structure,
+        "currency": ssa.currency or "INR",
         "earnings": earnings,
         "deductions": deductions
     }
@@ -76,59 +75,211 @@ def get_salary_structure_for_employee(employee):
 
 @frappe.whitelist()
 def get_attendance_and_days(employee, start_date, deduct_weekly_off=1):
+    days = get_attendance_and_days_bulk(
+        start_date, employees=[employee], deduct_weekly_off=deduct_weekly_off
+    )
+
+    if employee not in days:
+        # never invent attendance (a full pay slip) for a link we cannot read
+        frappe.throw(
+            _("Company Link {0} not found or not permitted").format(frappe.bold(employee)),
+            frappe.PermissionError,
+        )
+
+    return days[employee]
+
+
+@frappe.whitelist()
+def get_attendance_and_days_bulk(start_date, company=None, employees=None, deduct_weekly_off=1):
+    """
+    get_attendance_and_days for many employees in one round trip:
+    the active Company Links of `company`, or the given `employees`.
+
+    Returns {company_link: days}. Attendance is counted with a single
+    GROUP BY employee, status; weekly offs and holidays come from the
+    working calendar of each employee.
+
+    Needs Salary Slip or Attendance read permission and only counts the
+    Company Links in the user's company scope.
+    """
+    if not (frappe.has_permission("Salary Slip", "read") or frappe.has_permission("Attendance", "read")):
+        frappe.throw(_("Not permitted"), frappe.PermissionError)
+
     start_date = getdate(start_date)
     end_date = get_last_day(start_date)
 
-    deduct_weekly_off = int(deduct_weekly_off)
+    employees = frappe.parse_json(employees) if employees else None
+    if isinstance(employees, str):
+        employees = [employees]
+
+    if employees:
+        condition = "cl.name IN %(employees)s"
+    elif company:
+        condition = "cl.company = %(company)s AND cl.is_active = 1"
+    else:
+        frappe.throw(_("Company or Employees are required"))
+
+    companies = get_allowed_companies(frappe.session.user)
+    if companies:
+        if company and company not in companies:
+            frappe.throw(_("Not permitted for company {0}").format(company), frappe.PermissionError)
+
+        condition += " AND cl.company IN %(companies)s"
 
-    weekly_off = frappe.db.get_value("Company Link", employee, "weekly_off")
-    total_days = calendar.monthrange(start_date.year, start_date.month)[1]
+    rows = frappe.db.sql(f"""
+        SELECT cl.name, att.status, COUNT(att.name)
+        FROM `tabCompany Link` cl
+        LEFT JOIN `tabAttendance` att
+            ON att.employee = cl.name
+            AND att.attendance_date BETWEEN %(start_date)s AND %(end_date)s
+        WHERE {condition}
+        GROUP BY cl.name, att.status
+    """, {
+        "employees": tuple(employees or ()),
+        "company": company,
+        "companies": tuple(companies or ()),
+        "start_date": start_date,
+        "end_date": end_date
+    })
 
-    # Weekly offs
-    weekly_off_count = 0
-    day_map = {
-        "Monday": 0, "Tuesday": 1, "Wednesday": 2,
-        "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6
+    status_counts = {}
+
+    for employee, status, count in rows:
+        counts = status_counts.setdefault(employee, {})
+        if status:
+            counts[status] = count
+
+    working_calendar = WorkingCalendar(list(status_counts))
+
+    return {
+        employee: get_payment_days(
+            working_calendar.get_codes(employee, start_date, end_date),
+            counts,
+            deduct_weekly_off,
+        )
+        for employee, counts in status_counts.items()
     }
 
-    if weekly_off:
-        off_day = day_map.get(weekly_off)
-        current = start_date
-        while current <= end_date:
-            if current.weekday() == off_day:
-                weekly_off_count += 1
-            current += timedelta(days=1)
-
-    # Attendance records - FIXED: Removed docstatus filter since Attendance is not submittable
-    attendance = frappe.db.get_all(
-        "Attendance",
-        filters={
-            "employee": employee,
-            "attendance_date": ["between", [start_date, end_date]]
-        },
-        fields=["status"]
-    )
 
-    present_days = 0
-    absent_days = 0
+def get_payment_days(month_codes, status_counts, deduct_weekly_off=1):
+    """
+    Days of a month from the employee's working calendar for the month
+    (`month_codes`) and attendance {status: count}.
+    Present / On Leave count as present, Half Day as half present and half absent.
+    Holidays are paid and stay in the working days.
+    """
+    total_days = len(month_codes)
+    weekly_off_count = month_codes.count(WEEKLY_OFF)
 
-    for a in attendance:
-        if a.status in ["Present", "On Leave"]:
-            present_days += 1
-        elif a.status == "Half Day":
-            present_days += 0.5
-            absent_days += 0.5
-        elif a.status == "Absent":
-            absent_days += 1
+    half_days = status_counts.get("Half Day", 0)
+    present_days = status_counts.get("Present", 0) + status_counts.get("On Leave", 0) + half_days * 0.5
+    absent_days = status_counts.get("Absent", 0) + half_days * 0.5
 
-    working_days = total_days - weekly_off_count if deduct_weekly_off else total_days
+    working_days = total_days - weekly_off_count if cint(deduct_weekly_off) else total_days
     payment_days = working_days - absent_days
 
     return {
         "total_days": total_days,
         "weekly_offs": weekly_off_count,
+        "holidays": month_codes.count(HOLIDAY),
         "working_days": working_days,
         "payment_days": payment_days,
         "present_days": present_days,
         "absent_days": absent_days
-    }
\ No newline at end of file
+    }
+
+
+# Deduction kinds used by the computation engine
+EMPLOYEE_DEDUCTION = 0
+EMPLOYER_CONTRIBUTION = 1
+RETENTION = 2
+
+def compute_salary_batch(slips):
+    """
+    Salary computation engine shared by the Salary Slip form and bulk payroll.
+    Same rules as `recalculate_salary` in salary_slip.js.
+
+    `slips` is a list of dicts with `earnings` and `deductions` rows (dicts or
+    child docs with base_amount / amount, depends_on_payment_days,
+    employer_contribution, deduct_from_cash_in_hand_only, salary_component),
+    `working_days` and `payment_days`.
+
+    All rows of the batch are flattened into columns (slip index, base,
+    pro-rata flag, kind) and computed in one pass, then summed per slip.
+    Row amounts are pro-rated in place; a list of totals dicts is returned.
+    """
+    ratios = []
+    slip_col, base_col, prorate_col, kind_col, rows = [], [], [], [], []
+
+    for i, slip in enumerate(slips):
+        wd = flt(slip.get("working_days"))
+        pd = flt(slip.get("payment_days"))
+        ratios.append((wd, pd))
+
+        for row in slip.get("earnings") or []:
+            slip_col.append(i)
+            base_col.append(flt(row.get("base_amount") or row.get("amount")))
+            prorate_col.append(bool(row.get("depends_on_payment_days")) and wd > 0)
+            kind_col.append(None)
+            rows.append(row)
+
+        for row in slip.get("deductions") or []:
+            slip_col.append(i)
+            base_col.append(flt(row.get("base_amount") or row.get("amount")))
+            prorate_col.append(bool(row.get("depends_on_payment_days")) and wd > 0)
+            kind_col.append(get_deduction_kind(row))
+            rows.append(row)
+
+    amount_col = [
+        flt((base / ratios[i][0]) * ratios[i][1], 2) if prorate else flt(base, 2)
+        for i, base, prorate in zip(slip_col, base_col, prorate_col)
+    ]
+
+    # per slip sums: gross, employee deductions, employer contribution, retention
+    sums = [[0.0, 0.0, 0.0, 0.0] for _ in slips]
+    for i, kind, amount in zip(slip_col, kind_col, amount_col):
+        sums[i][0 if kind is None else kind + 1] += amount
+
+    for row, base, amount in zip(rows, base_col, amount_col):
+        row.update({"base_amount": base, "amount": amount})
+
+    totals = []
+    for gross, employee_deductions, employer_contribution, retention in sums:
+        net_salary = gross - employee_deductions
+        monthly_ctc = gross + employer_contribution
+
+        totals.append({
+            "gross_salary": gross,
+            "total_earnings": gross,
+            "total_deductions": employee_deductions,
+            "total_employer_contribution": employer_contribution,
+            "retention": retention,
+            "net_salary": net_salary,
+            "cash_in_hand": net_salary - retention,
+            "monthly_ctc": monthly_ctc,
+            "annual_ctc": monthly_ctc * 12,
+        })
+
+    return totals
+
+
+def get_deduction_kind(row):
+    if row.get("employer_contribution"):
+        return EMPLOYER_CONTRIBUTION
+
+    # only "Retention" stays out of total deductions
+    if row.get("deduct_from_cash_in_hand_only") and row.get("salary_component") == "Retention":
+        return RETENTION
+
+    return EMPLOYEE_DEDUCTION
+
+
+def calculate_salary(earnings, deductions, working_days, payment_days):
+    """Totals of a single slip, see compute_salary_batch"""
+    return compute_salary_batch([{
+        "earnings": earnings,
+        "deductions": deductions,
+        "working_days": working_days,
+        "payment_days": payment_days,
+    }])[0]
+
@@ -1,9 +1,152 @@
 # Copyright (c) 2026, sj and Contributors
 # See license.txt
 
-# import frappe
+import random
+
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt
+
+from saral_hr.saral_hr.doctype.salary_slip.salary_slip import (
+	calculate_salary,
+	compute_salary_batch,
+)
+
+
+def js_recalculate_salary(earnings, deductions, wd, pd):
+	"""Line by line transcription of recalculate_salary in salary_slip.js"""
+	gross = 0
+	employee_deductions = 0
+	employer_contribution = 0
+	retention = 0
+
+	wd = flt(wd)
+	pd = flt(pd)
+
+	for row in earnings:
+		base = row.get("base_amount") or row.get("amount") or 0
+		amount = (base / wd) * pd if row.get("depends_on_payment_days") and wd > 0 else base
+		gross += flt(amount, 2)
+
+	for row in deductions:
+		base = row.get("base_amount") or row.get("amount") or 0
+		amount = (base / wd) * pd if row.get("depends_on_payment_days") and wd > 0 else base
+		amount = flt(amount, 2)
+
+		if row.get("employer_contribution"):
+			employer_contribution += amount
+		elif row.get("deduct_from_cash_in_hand_only") and row.get("salary_component") == "Retention":
+			retention += amount
+		else:
+			employee_deductions += amount
+
+	net_salary = gross - employee_deductions
+	monthly_ctc = gross + employer_contribution
+
+	return {
+		"gross_salary": gross,
+		"total_earnings": gross,
+		"total_deductions": employee_deductions,
+		"total_employer_contribution": employer_contribution,
+		"retention": retention,
+		"net_salary": net_salary,
+		"cash_in_hand": net_salary - retention,
+		"monthly_ctc": monthly_ctc,
+		"annual_ctc": monthly_ctc * 12,
+	}
+
+
+def make_slip():
+	return {
+		"working_days": 26,
+		"payment_days": 24.5,
+		"earnings": [
+			{"salary_component": "Basic", "amount": 15000, "depends_on_payment_days": 1},
+			{"salary_component": "HRA", "amount": 6000, "depends_on_payment_days": 1},
+			{"salary_component": "Conveyance", "amount": 1600, "depends_on_payment_days": 0},
+		],
+		"deductions": [
+			{"salary_component": "Employee PF", "amount": 1800, "deduct_from_cash_in_hand_only": 1},
+			{"salary_component": "Professional Tax", "amount": 200},
+			{"salary_component": "Employer PF", "amount": 1800, "employer_contribution": 1},
+			{
+				"salary_component": "Retention",
+				"amount": 1000,
+				"deduct_from_cash_in_hand_only": 1,
+				"depends_on_payment_days": 1,
+			},
+		],
+	}
 
 
 class TestSalarySlip(FrappeTestCase):
-	pass
+	def test_single_slip(self):
+		slip = make_slip()
+		totals = calculate_salary(
+			slip["earnings"], slip["deductions"], slip["working_days"], slip["payment_days"]
+		)
+
+		# 15000 / 26 * 24.5 + 6000 / 26 * 24.5 + 1600
+		self.assertAlmostEqual(totals["gross_salary"], 14134.62 + 5653.85 + 1600)
+		self.assertAlmostEqual(totals["total_deductions"], 2000)
+		self.assertAlmostEqual(totals["total_employer_contribution"], 1800)
+		self.assertAlmostEqual(totals["retention"], 942.31)
+		self.assertAlmostEqual(totals["net_salary"], totals["gross_salary"] - 2000)
+		self.assertAlmostEqual(totals["cash_in_hand"], totals["net_salary"] - 942.31)
+		self.assertAlmostEqual(totals["annual_ctc"], (totals["gross_salary"] + 1800) * 12)
+
+		# rows are pro-rated in place and keep their structure amount
+		self.assertEqual(slip["earnings"][0]["base_amount"], 15000)
+		self.assertEqual(slip["earnings"][0]["amount"], 14134.62)
+
+	def test_recompute_does_not_prorate_twice(self):
+		slip = make_slip()
+		first = compute_salary_batch([slip])[0]
+		second = compute_salary_batch([slip])[0]
+
+		self.assertEqual(first, second)
+
+	def test_zero_working_days_uses_base_amount(self):
+		slip = make_slip()
+		slip["working_days"] = 0
+		totals = compute_salary_batch([slip])[0]
+
+		self.assertAlmostEqual(totals["gross_salary"], 22600)
+
+	def test_batch_parity_with_js(self):
+		rng = random.Random(42)
+		components = ["Basic", "HRA", "DA", "Employee PF", "Employer PF", "Retention", "Bonus"]
+
+		slips = []
+		for _ in range(500):
+			wd = rng.choice([0, 24, 26, 28, 30, 31])
+			slips.append({
+				"working_days": wd,
+				"payment_days": rng.uniform(0, wd or 1),
+				"earnings": [
+					{
+						"salary_component": rng.choice(components),
+						"amount": round(rng.uniform(0, 50000), 2),
+						"depends_on_payment_days": rng.randint(0, 1),
+					}
+					for _ in range(rng.randint(0, 8))
+				],
+				"deductions": [
+					{
+						"salary_component": rng.choice(components),
+						"amount": round(rng.uniform(0, 5000), 2),
+						"depends_on_payment_days": rng.randint(0, 1),
+						"employer_contribution": rng.randint(0, 1),
+						"deduct_from_cash_in_hand_only": rng.randint(0, 1),
+					}
+					for _ in range(rng.randint(0, 6))
+				],
+			})
+
+		expected = [
+			js_recalculate_salary(s["earnings"], s["deductions"], s["working_days"], s["payment_days"])
+			for s in slips
+		]
+
+		for totals, js_totals in zip(compute_salary_batch(slips), expected):
+			for field, value in js_totals.items():
+				self.assertAlmostEqual(totals[field], value, places=6)
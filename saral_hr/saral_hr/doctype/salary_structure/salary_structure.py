@@ -1,10 +1,14 @@
 # Copyright (c) 2026, sj and contributors
 # For license information, please see license.txt
 
+from itertools import groupby
+
 import frappe
 from frappe.model.document import Document
 from frappe import _
 
+from saral_hr.saral_hr.doctype.salary_component.salary_component import get_salary_components
+
 
 class SalaryStructure(Document):
     def validate(self):
@@ -13,48 +17,88 @@ class SalaryStructure(Document):
 
     def validate_salary_components(self):
         """Validate that earnings have Earning type and deductions have Deduction type"""
-        
-        # Check earnings
-        for earning in self.get('earnings', []):
-            if earning.salary_component:
-                component_type = frappe.db.get_value(
-                    'Salary Component',
-                    earning.salary_component,
-                    'type'
+        validate_salary_component_rows(self.get("earnings", []), self.get("deductions", []))
+
+
+def validate_salary_component_rows(earnings, deductions):
+    """Throw every component type / duplicate error of a structure or assignment"""
+    errors = get_salary_component_errors(earnings, deductions)
+    if errors:
+        frappe.throw(errors, as_list=True)
+
+
+def get_salary_component_errors(earnings, deductions, components=None):
+    """
+    Component type and duplicate errors of earnings / deductions rows.
+    Types come from the cached component registry, so no query per row.
+    """
+    components = components if components is not None else get_salary_components()
+    errors = []
+
+    # Check earnings
+    for row in earnings:
+        if row.salary_component and (components.get(row.salary_component) or {}).get("type") != "Earning":
+            errors.append(
+                _('Row #{0}: Component {1} is not an Earning type component. Please select an Earning component.').format(
+                    row.idx,
+                    frappe.bold(row.salary_component)
                 )
-                if component_type != 'Earning':
-                    frappe.throw(
-                        _('Row #{0}: Component {1} is not an Earning type component. Please select an Earning component.').format(
-                            earning.idx,
-                            frappe.bold(earning.salary_component)
-                        )
-                    )
-        
-        # Check deductions
-        for deduction in self.get('deductions', []):
-            if deduction.salary_component:
-                component_type = frappe.db.get_value(
-                    'Salary Component',
-                    deduction.salary_component,
-                    'type'
+            )
+
+    # Check deductions
+    for row in deductions:
+        if row.salary_component and (components.get(row.salary_component) or {}).get("type") != "Deduction":
+            errors.append(
+                _('Row #{0}: Component {1} is not a Deduction type component. Please select a Deduction component.').format(
+                    row.idx,
+                    frappe.bold(row.salary_component)
                 )
-                if component_type != 'Deduction':
-                    frappe.throw(
-                        _('Row #{0}: Component {1} is not a Deduction type component. Please select a Deduction component.').format(
-                            deduction.idx,
-                            frappe.bold(deduction.salary_component)
-                        )
-                    )
-        
-        # Check for duplicate components in earnings
-        earnings_components = [d.salary_component for d in self.get('earnings', []) if d.salary_component]
-        if len(earnings_components) != len(set(earnings_components)):
-            frappe.throw(_('Duplicate salary components found in Earnings table. Each component can only be added once.'))
-        
-        # Check for duplicate components in deductions
-        deductions_components = [d.salary_component for d in self.get('deductions', []) if d.salary_component]
-        if len(deductions_components) != len(set(deductions_components)):
-            frappe.throw(_('Duplicate salary components found in Deductions table. Each component can only be added once.'))
+            )
+
+    # Check for duplicate components in earnings
+    earnings_components = [d.salary_component for d in earnings if d.salary_component]
+    if len(earnings_components) != len(set(earnings_components)):
+        errors.append(_('Duplicate salary components found in Earnings table. Each component can only be added once.'))
+
+    # Check for duplicate components in deductions
+    deductions_components = [d.salary_component for d in deductions if d.salary_component]
+    if len(deductions_components) != len(set(deductions_components)):
+        errors.append(_('Duplicate salary components found in Deductions table. Each component can only be added once.'))
+
+    return errors
+
+
+def revalidate_salary_structures(doctypes=("Salary Structure", "Salary Structure Assignment")):
+    """
+    Audit every Salary Structure / Assignment against the current component
+    types (e.g. after a component's type changed).
+
+    All Salary Details rows are read in one query per doctype and checked
+    against the registry. Returns {(doctype, name): [errors]} for the
+    invalid documents only.
+    """
+    components = get_salary_components()
+    invalid = {}
+
+    for doctype in doctypes:
+        rows = frappe.db.sql("""
+            SELECT parent, parentfield, idx, salary_component
+            FROM `tabSalary Details`
+            WHERE parenttype = %(doctype)s
+                AND parentfield IN ('earnings', 'deductions')
+            ORDER BY parent, parentfield, idx
+        """, {"doctype": doctype}, as_dict=True)
+
+        for parent, parent_rows in groupby(rows, key=lambda row: row.parent):
+            tables = {"earnings": [], "deductions": []}
+            for row in parent_rows:
+                tables[row.parentfield].append(row)
+
+            errors = get_salary_component_errors(tables["earnings"], tables["deductions"], components)
+            if errors:
+                invalid[(doctype, parent)] = errors
+
+    return invalid
 
 
 def flt(value, decimals=2):
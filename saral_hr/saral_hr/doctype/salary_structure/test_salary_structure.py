@@ -1,9 +1,38 @@
 # Copyright (c) 2026, sj and Contributors
 # See license.txt
 
-# import frappe
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from saral_hr.saral_hr.doctype.salary_structure.salary_structure import get_salary_component_errors
+
+COMPONENTS = {
+	"Basic": frappe._dict(type="Earning"),
+	"HRA": frappe._dict(type="Earning"),
+	"Employee PF": frappe._dict(type="Deduction"),
+}
+
+
+def make_rows(*components):
+	return [frappe._dict(idx=i, salary_component=c) for i, c in enumerate(components, start=1)]
+
 
 class TestSalaryStructure(FrappeTestCase):
-	pass
+	def test_valid_rows(self):
+		errors = get_salary_component_errors(
+			make_rows("Basic", "HRA"), make_rows("Employee PF"), COMPONENTS
+		)
+
+		self.assertEqual(errors, [])
+
+	def test_wrong_type_and_unknown_component(self):
+		errors = get_salary_component_errors(
+			make_rows("Basic", "Employee PF"), make_rows("HRA", "Missing"), COMPONENTS
+		)
+
+		self.assertEqual(len(errors), 3)
+
+	def test_duplicates(self):
+		errors = get_salary_component_errors(make_rows("Basic", "Basic"), [], COMPONENTS)
+
+		self.assertEqual(len(errors), 1)
@@ -1,9 +1,105 @@
 # Copyright (c) 2026, sj and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
+from frappe import _
 from frappe.model.document import Document
+from frappe.utils import get_last_day, getdate
+
+from saral_hr.saral_hr.doctype.salary_structure.salary_structure import validate_salary_component_rows
 
 
 class SalaryStructureAssignment(Document):
-	pass
+
+	def validate(self):
+		if self.from_date and self.to_date and getdate(self.from_date) > getdate(self.to_date):
+			frappe.throw(_("From Date cannot be after To Date"))
+
+		validate_salary_component_rows(self.get("earnings", []), self.get("deductions", []))
+
+
+def on_doctype_update():
+	frappe.db.add_index("Salary Structure Assignment", ["employee", "from_date", "to_date"])
+
+
+# ----------------------------------------------------------------------
+# Effective-dated resolution
+# ----------------------------------------------------------------------
+def get_salary_structure_assignment(employee, start_date, end_date=None):
+	"""
+	Assignment of one employee (Company Link) in effect for a period,
+	with its `earnings` and `deductions` rows. None if there is none.
+	"""
+	return get_salary_structure_assignments(start_date, end_date, employees=[employee]).get(employee)
+
+
+def get_salary_structure_assignments(start_date, end_date=None, company=None, employees=None):
+	"""
+	Assignments in effect for the period from `start_date` to `end_date`
+	(default: end of that month), for the given employees or every Company
+	Link of `company`.
+
+	An assignment is in effect when it starts on or before the period end and
+	has no `to_date` or ends on or after the period start; when several
+	overlap the latest `from_date` wins. Resolved with one range query on the
+	(employee, from_date, to_date) index, then one query for all the Salary
+	Details rows.
+
+	Returns {employee: assignment} with `earnings` and `deductions` lists.
+	"""
+	start_date = getdate(start_date)
+	end_date = getdate(end_date) if end_date else get_last_day(start_date)
+
+	if employees:
+		condition = "ssa.employee IN %(employees)s"
+	elif company:
+		condition = """ssa.employee IN (
+			SELECT cl.name FROM `tabCompany Link` cl WHERE cl.company = %(company)s
+		)"""
+	else:
+		frappe.throw(_("Company or Employees are required"))
+
+	rows = frappe.db.sql(f"""
+		SELECT name, employee, salary_structure, currency, from_date, to_date
+		FROM (
+			SELECT
+				ssa.name, ssa.employee, ssa.salary_structure, ssa.currency,
+				ssa.from_date, ssa.to_date,
+				ROW_NUMBER() OVER (
+					PARTITION BY ssa.employee
+					ORDER BY ssa.from_date DESC, ssa.creation DESC
+				) AS row_no
+			FROM `tabSalary Structure Assignment` ssa
+			WHERE {condition}
+				AND ssa.docstatus < 2
+				AND ssa.from_date <= %(end_date)s
+				AND (ssa.to_date IS NULL OR ssa.to_date >= %(start_date)s)
+		) effective
+		WHERE row_no = 1
+	""", {
+		"employees": tuple(employees or ()),
+		"company": company,
+		"start_date": start_date,
+		"end_date": end_date,
+	}, as_dict=True)
+
+	assignments = {}
+	for ssa in rows:
+		ssa.earnings = []
+		ssa.deductions = []
+		assignments[ssa.name] = ssa
+
+	if assignments:
+		for row in frappe.get_all(
+			"Salary Details",
+			filters={
+				"parenttype": "Salary Structure Assignment",
+				"parent": ["in", list(assignments)],
+				"parentfield": ["in", ["earnings", "deductions"]],
+			},
+			fields=["parent", "parentfield", "salary_component", "amount"],
+			order_by="parent asc, parentfield asc, idx asc",
+		):
+			assignments[row.parent][row.parentfield].append(row)
+
+	return {ssa.employee: ssa for ssa in assignments.values()}
@@ -1,28 +1,70 @@
-# Copyright (c) 2026, sj and contributors
-# For license information, please see license.txt
+# Copyright (c) 2026, sj and Contributors
+# See license.txt
 
 import frappe
-from frappe import _
-from frappe.model.document import Document
+from frappe.tests.utils import FrappeTestCase
 
+from saral_hr.saral_hr.doctype.salary_structure_assignment.salary_structure_assignment import (
+	get_salary_structure_assignments,
+)
 
-class SalaryStructureAssignment(Document):
+TEST_EMPLOYEE = "_Test SSA Company Link"
 
-    def validate(self):
-        self.validate_employee_active()
 
-    def validate_employee_active(self):
-        if not self.employee:
-            return
+def make_assignment(name, from_date, to_date=None, creation=None, basic=1000):
+	"""Salary Structure Assignment written without validation"""
+	ssa = frappe.get_doc({
+		"doctype": "Salary Structure Assignment",
+		"name": name,
+		"employee": TEST_EMPLOYEE,
+		"salary_structure": "_Test Salary Structure",
+		"from_date": from_date,
+		"to_date": to_date,
+	})
+	ssa.db_insert()
 
-        is_active = frappe.db.get_value(
-            "Company Link",
-            self.employee,
-            "is_active"
-        )
+	if creation:
+		frappe.db.set_value("Salary Structure Assignment", name, "creation", creation, update_modified=False)
 
-        if not is_active:
-            frappe.throw(
-                _("Cannot assign salary structure to an inactive employee: {0}")
-                .format(frappe.bold(self.employee))
-            )
+	ssa.append("earnings", {"salary_component": "Basic", "amount": basic}).db_insert()
+	return ssa
+
+
+def get_assignment(start_date):
+	return get_salary_structure_assignments(start_date, employees=[TEST_EMPLOYEE]).get(TEST_EMPLOYEE)
+
+
+class TestSalaryStructureAssignment(FrappeTestCase):
+	def test_ended_before_period(self):
+		make_assignment("_Test SSA 1", "2025-01-01", "2025-12-31")
+
+		self.assertIsNone(get_assignment("2026-01-01"))
+		self.assertEqual(get_assignment("2025-12-01").name, "_Test SSA 1")
+
+	def test_ends_on_period_start(self):
+		make_assignment("_Test SSA 1", "2025-01-01", "2026-01-01")
+		self.assertEqual(get_assignment("2026-01-01").name, "_Test SSA 1")
+
+	def test_starts_after_period(self):
+		make_assignment("_Test SSA 1", "2026-02-01")
+		self.assertIsNone(get_assignment("2026-01-01"))
+
+	def test_open_ended(self):
+		make_assignment("_Test SSA 1", "2024-04-01")
+
+		for start_date in ("2024-04-01", "2026-01-01", "2030-12-01"):
+			self.assertEqual(get_assignment(start_date).name, "_Test SSA 1")
+
+	def test_same_month_latest_start_wins(self):
+		make_assignment("_Test SSA 1", "2026-01-01", basic=1000)
+		make_assignment("_Test SSA 2", "2026-01-15", basic=1200)
+
+		assignment = get_assignment("2026-01-01")
+		self.assertEqual(assignment.name, "_Test SSA 2")
+		self.assertEqual([row.amount for row in assignment.earnings], [1200])
+
+	def test_same_start_latest_created_wins(self):
+		make_assignment("_Test SSA 1", "2026-01-01", creation="2026-01-01 10:00:00")
+		make_assignment("_Test SSA 2", "2026-01-01", creation="2026-01-02 10:00:00")
+
+		self.assertEqual(get_assignment("2026-01-01").name, "_Test SSA 2")
@@ -5,7 +5,13 @@ import frappe
 from frappe.model.document import Document
 from frappe import _
 from frappe.utils import getdate, nowdate
-from datetime import date
+from bisect import bisect_right
+from datetime import date, timedelta
+
+from saral_hr.company_link_cache import get_company_link, get_many
+from saral_hr.permission import check_company_scope
+
+OPEN_END_DATE = date(2099, 12, 31)
 
 
 class ShiftAssignment(Document):
@@ -31,8 +37,8 @@ class ShiftAssignment(Document):
 		if self.status != "Active":
 			return
 
-		emp = frappe.get_doc("Company Link", self.employee)
-		if not emp.is_active:
+		emp = get_company_link(self.employee)
+		if not emp or not emp.is_active:
 			frappe.throw(_("Cannot assign shift to inactive employee"))
 
 	# --------------------------------------------------
@@ -42,32 +48,24 @@ class ShiftAssignment(Document):
 		if self.status != "Active":
 			return
 
-		existing = frappe.get_all(
-			"Shift Assignment",
-			filters={
-				"employee": self.employee,
-				"status": "Active",
-				"name": ("!=", self.name)
-			},
-			fields=["from_date", "to_date"]
-		)
-
-		for row in existing:
-			if self.is_overlap(
-				getdate(self.from_date),
-				getdate(self.to_date) if self.to_date else None,
-				getdate(row.from_date),
-				getdate(row.to_date) if row.to_date else None
-			):
-				frappe.throw(_("Employee already has an active shift in this period"))
-
-	# --------------------------------------------------
-	# OVERLAP LOGIC
-	# --------------------------------------------------
-	def is_overlap(self, s1, e1, s2, e2):
-		e1 = e1 or date(2099, 12, 31)
-		e2 = e2 or date(2099, 12, 31)
-		return s1 <= e2 and s2 <= e1
+		overlapping = frappe.db.sql("""
+			SELECT name
+			FROM `tabShift Assignment`
+			WHERE employee = %(employee)s
+				AND status = 'Active'
+				AND name != %(name)s
+				AND from_date <= %(to_date)s
+				AND (to_date IS NULL OR to_date >= %(from_date)s)
+			LIMIT 1
+		""", {
+			"employee": self.employee,
+			"name": self.name or "",
+			"from_date": getdate(self.from_date),
+			"to_date": getdate(self.to_date) if self.to_date else OPEN_END_DATE,
+		})
+
+		if overlapping:
+			frappe.throw(_("Employee already has an active shift in this period"))
 
 	# --------------------------------------------------
 	# AUTO COMPLETE OLD ASSIGNMENTS
@@ -78,19 +76,119 @@ class ShiftAssignment(Document):
 				self.status = "Completed"
 
 
+def on_doctype_update():
+	frappe.db.add_index(
+		"Shift Assignment", ["employee", "status", "from_date", "to_date"]
+	)
+
+
 @frappe.whitelist()
 def get_active_shift(employee, on_date=None):
 	on_date = getdate(on_date or nowdate())
 
-	assignment = frappe.db.get_value(
-		"Shift Assignment",
-		{
-			"employee": employee,
-			"status": "Active",
-			"from_date": ("<=", on_date),
-			"to_date": ("in", [None, "", (">=", on_date)])
-		},
-		"shift"
-	)
+	assignment = frappe.db.sql("""
+		SELECT shift
+		FROM `tabShift Assignment`
+		WHERE employee = %(employee)s
+			AND status = 'Active'
+			AND from_date <= %(on_date)s
+			AND (to_date IS NULL OR to_date >= %(on_date)s)
+		ORDER BY from_date DESC
+		LIMIT 1
+	""", {"employee": employee, "on_date": on_date})
+
+	return assignment[0][0] if assignment else None
+
+
+# --------------------------------------------------
+# BULK SHIFT RESOLUTION
+# --------------------------------------------------
+class ShiftResolver:
+	"""
+	Shift of each employee-day for a set of employees and a date range,
+	from one range query. Assignments are kept per employee sorted by
+	from_date and looked up with bisect; when assignments overlap the
+	latest starting one wins, as in get_active_shift.
+	"""
+
+	def __init__(self, employees, from_date, to_date):
+		self.from_date = getdate(from_date)
+		self.to_date = getdate(to_date)
+		self.intervals = {}
+
+		employees = list(set(employees or []))
+		if not employees:
+			return
 
-	return assignment
+		assignments = frappe.db.sql("""
+			SELECT employee, shift, from_date, to_date
+			FROM `tabShift Assignment`
+			WHERE employee IN %(employees)s
+				AND status = 'Active'
+				AND from_date <= %(to_date)s
+				AND (to_date IS NULL OR to_date >= %(from_date)s)
+			ORDER BY employee, from_date
+		""", {
+			"employees": tuple(employees),
+			"from_date": self.from_date,
+			"to_date": self.to_date,
+		}, as_dict=True)
+
+		for a in assignments:
+			starts, rows = self.intervals.setdefault(a.employee, ([], []))
+			starts.append(getdate(a.from_date))
+			rows.append((getdate(a.to_date) if a.to_date else OPEN_END_DATE, a.shift))
+
+	def get(self, employee, on_date):
+		"""Shift of the employee on `on_date`, or None"""
+		if employee not in self.intervals:
+			return None
+
+		on_date = getdate(on_date)
+		starts, rows = self.intervals[employee]
+
+		# an earlier assignment may still cover the date when they overlap
+		for i in range(bisect_right(starts, on_date) - 1, -1, -1):
+			to_date, shift = rows[i]
+			if on_date <= to_date:
+				return shift
+
+		return None
+
+	def get_employee_days(self, employee):
+		"""{date: shift} for the employee over the resolver's range"""
+		days = {}
+		for start, (to_date, shift) in zip(*self.intervals.get(employee, ([], []))):
+			day = max(start, self.from_date)
+			while day <= min(to_date, self.to_date):
+				days[day] = shift
+				day += timedelta(days=1)
+
+		return days
+
+
+@frappe.whitelist()
+def resolve_shifts(employees, from_date, to_date):
+	"""
+	Shift per employee-day: {employee: {"YYYY-MM-DD": shift}}
+	"""
+	frappe.has_permission("Shift Assignment", "read", throw=True)
+
+	employees = frappe.parse_json(employees) if employees else []
+	if isinstance(employees, str):
+		employees = [employees]
+
+	company_links = get_many(employees)
+	for employee in employees:
+		if employee not in company_links:
+			frappe.throw(_("Company Link {0} not found").format(employee), frappe.DoesNotExistError)
+
+	for company in {company_link.company for company_link in company_links.values()}:
+		check_company_scope(company)
+
+	resolver = ShiftResolver(employees, from_date, to_date)
+
+	return {
+		employee: {str(day): shift for day, shift in resolver.get_employee_days(employee).items()}
+		for employee in employees
+	}
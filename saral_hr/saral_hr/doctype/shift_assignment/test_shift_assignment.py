@@ -1,9 +1,71 @@
 # Copyright (c) 2026, sj and Contributors
 # See license.txt
 
-# import frappe
+from datetime import date
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from saral_hr.saral_hr.doctype.shift_assignment.shift_assignment import ShiftResolver
+
+
+def get_resolver(assignments, from_date=date(2026, 1, 1), to_date=date(2026, 12, 31)):
+	rows = [
+		frappe._dict(employee=employee, shift=shift, from_date=start, to_date=end)
+		for employee, shift, start, end in sorted(assignments, key=lambda a: (a[0], a[2]))
+	]
+
+	with patch.object(frappe.db, "sql", return_value=rows):
+		return ShiftResolver({a[0] for a in assignments}, from_date, to_date)
+
+
+class TestShiftResolver(FrappeTestCase):
+	def test_bounds_are_inclusive(self):
+		resolver = get_resolver([("CL-1", "Day", date(2026, 3, 1), date(2026, 3, 31))])
+
+		self.assertIsNone(resolver.get("CL-1", date(2026, 2, 28)))
+		self.assertEqual(resolver.get("CL-1", date(2026, 3, 1)), "Day")
+		self.assertEqual(resolver.get("CL-1", date(2026, 3, 31)), "Day")
+		self.assertIsNone(resolver.get("CL-1", date(2026, 4, 1)))
+
+	def test_open_ended(self):
+		resolver = get_resolver([("CL-1", "Day", date(2026, 3, 1), None)])
+
+		self.assertIsNone(resolver.get("CL-1", date(2026, 2, 28)))
+		self.assertEqual(resolver.get("CL-1", date(2026, 3, 1)), "Day")
+		self.assertEqual(resolver.get("CL-1", date(2030, 1, 1)), "Day")
+
+		days = resolver.get_employee_days("CL-1")
+		self.assertEqual(min(days), date(2026, 3, 1))
+		self.assertEqual(max(days), date(2026, 12, 31))
+
+	def test_consecutive_assignments(self):
+		resolver = get_resolver([
+			("CL-1", "Day", date(2026, 1, 1), date(2026, 1, 31)),
+			("CL-1", "Night", date(2026, 2, 1), None),
+		])
+
+		self.assertEqual(resolver.get("CL-1", date(2026, 1, 31)), "Day")
+		self.assertEqual(resolver.get("CL-1", date(2026, 2, 1)), "Night")
+
+	def test_overlap_latest_start_wins(self):
+		resolver = get_resolver([
+			("CL-1", "Day", date(2026, 1, 1), date(2026, 12, 31)),
+			("CL-1", "Night", date(2026, 3, 1), date(2026, 3, 31)),
+		])
+
+		self.assertEqual(resolver.get("CL-1", date(2026, 2, 28)), "Day")
+		self.assertEqual(resolver.get("CL-1", date(2026, 3, 15)), "Night")
+		# the earlier assignment still covers the days after the later one ends
+		self.assertEqual(resolver.get("CL-1", date(2026, 4, 1)), "Day")
+
+		days = resolver.get_employee_days("CL-1")
+		self.assertEqual(days[date(2026, 3, 15)], "Night")
+		self.assertEqual(days[date(2026, 4, 1)], "Day")
+
+	def test_employee_without_assignment(self):
+		resolver = get_resolver([("CL-1", "Day", date(2026, 1, 1), None)])
 
-class TestShiftAssignment(FrappeTestCase):
-	pass
+		self.assertIsNone(resolver.get("CL-2", date(2026, 6, 1)))
+		self.assertEqual(resolver.get_employee_days("CL-2"), {})
@@ -0,0 +1,125 @@
+# Copyright (c) 2026, sj and contributors
+# For license information, please see license.txt
+
+from datetime import date
+
+import frappe
+from frappe import _
+from frappe.utils import cint
+
+from saral_hr.permission import check_company_scope
+
+
+def execute(filters=None):
+	"""
+	Payroll totals of a company for a year, read from the Payroll Register
+	Summary (kept up to date on Salary Slip submit / cancel), so no Salary
+	Slip or Salary Details rows are aggregated here.
+	"""
+	filters = frappe._dict(filters or {})
+
+	if not filters.company:
+		frappe.throw(_("Company is required"))
+
+	check_company_scope(filters.company)
+
+	group_by = filters.group_by or "Month"
+
+	if group_by == "Salary Component":
+		return get_component_columns(), get_component_data(filters)
+
+	return get_columns(group_by), get_data(filters, group_by)
+
+
+def get_conditions(filters):
+	year = cint(filters.year) or date.today().year
+
+	conditions = "company = %(company)s AND month BETWEEN %(from_month)s AND %(to_month)s"
+	values = {
+		"company": filters.company,
+		"from_month": date(year, 1, 1),
+		"to_month": date(year, 12, 1),
+		"department": filters.department,
+	}
+
+	if filters.department:
+		conditions += " AND department = %(department)s"
+
+	return conditions, values
+
+
+def get_columns(group_by):
+	if group_by == "Department":
+		columns = [{
+			"label": _("Department"),
+			"fieldname": "department",
+			"fieldtype": "Link",
+			"options": "Department",
+			"width": 180,
+		}]
+	else:
+		columns = [{"label": _("Month"), "fieldname": "month", "fieldtype": "Data", "width": 120}]
+
+	return columns + [
+		{"label": _("Salary Slips"), "fieldname": "headcount", "fieldtype": "Int", "width": 110},
+		{"label": _("Gross Salary"), "fieldname": "gross_salary", "fieldtype": "Currency", "width": 140},
+		{"label": _("Deductions"), "fieldname": "total_deductions", "fieldtype": "Currency", "width": 140},
+		{"label": _("Employer Contribution"), "fieldname": "total_employer_contribution", "fieldtype": "Currency", "width": 160},
+		{"label": _("Retention"), "fieldname": "retention", "fieldtype": "Currency", "width": 120},
+		{"label": _("Net Salary"), "fieldname": "net_salary", "fieldtype": "Currency", "width": 140},
+	]
+
+
+def get_data(filters, group_by):
+	conditions, values = get_conditions(filters)
+	group_field = "department" if group_by == "Department" else "month"
+
+	rows = frappe.db.sql(f"""
+		SELECT
+			{group_field},
+			SUM(CASE WHEN component_type = 'Net Pay' THEN headcount ELSE 0 END) AS headcount,
+			SUM(CASE WHEN component_type = 'Earning' THEN amount ELSE 0 END) AS gross_salary,
+			SUM(CASE WHEN component_type = 'Deduction' THEN amount ELSE 0 END) AS total_deductions,
+			SUM(CASE WHEN component_type = 'Employer Contribution' THEN amount ELSE 0 END)
+				AS total_employer_contribution,
+			SUM(CASE WHEN component_type = 'Retention' THEN amount ELSE 0 END) AS retention,
+			SUM(CASE WHEN component_type = 'Net Pay' THEN amount ELSE 0 END) AS net_salary
+		FROM `tabPayroll Register Summary`
+		WHERE {conditions}
+		GROUP BY {group_field}
+		ORDER BY {group_field}
+	""", values, as_dict=True)
+
+	for row in rows:
+		if group_by == "Month":
+			row.month = row.month.strftime("%b %Y")
+
+	return rows
+
+
+def get_component_columns():
+	return [
+		{
+			"label": _("Salary Component"),
+			"fieldname": "salary_component",
+			"fieldtype": "Link",
+			"options": "Salary Component",
+			"width": 200,
+		},
+		{"label": _("Type"), "fieldname": "component_type", "fieldtype": "Data", "width": 160},
+		{"label": _("Amount"), "fieldname": "amount", "fieldtype": "Currency", "width": 140},
+	]
+
+
+def get_component_data(filters):
+	conditions, values = get_conditions(filters)
+
+	return frappe.db.sql(f"""
+		SELECT salary_component, component_type, SUM(amount) AS amount
+		FROM `tabPayroll Register Summary`
+		WHERE {conditions}
+			AND component_type != 'Net Pay'
+		GROUP BY salary_component, component_type
+		ORDER BY FIELD(component_type, 'Earning', 'Deduction', 'Employer Contribution', 'Retention'),
+			salary_component
+	""", values, as_dict=True)
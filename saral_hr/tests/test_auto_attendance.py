@@ -0,0 +1,25 @@
+# Copyright (c) 2026, sj and Contributors
+# See license.txt
+
+from frappe.tests.utils import FrappeTestCase
+
+from saral_hr.auto_attendance import MARK_ABSENT, get_auto_attendance_outcome
+from saral_hr.working_calendar import HOLIDAY, WEEKLY_OFF, WORKING_DAY
+
+
+class TestAutoAttendance(FrappeTestCase):
+	def test_existing_attendance_is_kept(self):
+		self.assertEqual(get_auto_attendance_outcome(True, WORKING_DAY, "General"), "existing")
+
+	def test_weekly_off_and_holiday_are_skipped(self):
+		self.assertEqual(get_auto_attendance_outcome(False, WEEKLY_OFF, "General"), "weekly_off")
+		self.assertEqual(get_auto_attendance_outcome(False, HOLIDAY, "General"), "holiday")
+
+	def test_absent_with_shift(self):
+		self.assertEqual(get_auto_attendance_outcome(False, WORKING_DAY, "General"), MARK_ABSENT)
+
+	def test_without_shift(self):
+		self.assertEqual(get_auto_attendance_outcome(False, WORKING_DAY, None), "unassigned")
+		self.assertEqual(
+			get_auto_attendance_outcome(False, WORKING_DAY, None, mark_without_shift=1), MARK_ABSENT
+		)
@@ -0,0 +1,52 @@
+# Copyright (c) 2026, sj and Contributors
+# See license.txt
+
+import io
+from datetime import date
+from unittest.mock import patch
+
+from frappe.tests.utils import FrappeTestCase
+
+from saral_hr.bank_advice import format_amount, write_bank_advice
+
+ROWS = [
+	("SAL-0001", "CL-0001", "Asha Rao", "1234567890", 25000.5),
+	("SAL-0002", "CL-0002", "Ravi, K", None, 18000),
+]
+
+
+def export(file_format):
+	f = io.StringIO()
+	with patch("saral_hr.bank_advice.get_bank_advice_rows", return_value=iter(ROWS)):
+		stats = write_bank_advice(f, date(2026, 1, 1), date(2026, 1, 31), "_Test Company", "net_salary", file_format)
+
+	return f.getvalue(), stats
+
+
+class TestBankAdvice(FrappeTestCase):
+	def test_identical_bytes(self):
+		for file_format in ("CSV", "Fixed Width"):
+			first, first_stats = export(file_format)
+			second, second_stats = export(file_format)
+
+			self.assertEqual(first.encode("utf-8"), second.encode("utf-8"))
+			self.assertEqual(first_stats.checksum, second_stats.checksum)
+
+	def test_totals(self):
+		content, stats = export("CSV")
+
+		self.assertEqual(stats.records, 2)
+		self.assertEqual(stats.total, 43000.5)
+		self.assertEqual(stats.missing_account, 1)
+		self.assertTrue(content.splitlines()[-1].startswith("TRAILER,2,43000.50,"))
+
+	def test_fixed_width_records(self):
+		content, _stats = export("Fixed Width")
+		lines = content.splitlines()
+
+		self.assertEqual([line[0] for line in lines], ["H", "D", "D", "T"])
+		self.assertEqual(len({len(line) for line in lines[1:3]}), 1)
+
+	def test_format_amount(self):
+		self.assertEqual(format_amount(2500050), "25000.50")
+		self.assertEqual(format_amount(-5), "-0.05")
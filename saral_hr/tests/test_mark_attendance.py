@@ -0,0 +1,58 @@
+# Copyright (c) 2026, sj and Contributors
+# See license.txt
+
+from datetime import date
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from saral_hr.www.mark_attendance import index
+
+
+class TestAttendanceCodesForYear(FrappeTestCase):
+	def setUp(self):
+		self.patches = [
+			patch.object(frappe, "has_permission", return_value=True),
+			patch.object(index, "get_many", side_effect=lambda names: {
+				name: frappe._dict(name=name, company=LINK_COMPANIES[name])
+				for name in names if name in LINK_COMPANIES
+			}),
+			patch.object(index, "get_allowed_companies", return_value=["Company A"]),
+		]
+		for p in self.patches:
+			p.start()
+
+	def tearDown(self):
+		for p in reversed(self.patches):
+			p.stop()
+
+	def test_invalid_year(self):
+		for year in (10000, 99999, -5, 1):
+			with self.assertRaises(frappe.ValidationError):
+				index.get_attendance_codes_for_year(["CL-A"], year)
+
+	def test_unknown_employee(self):
+		with self.assertRaises(frappe.DoesNotExistError):
+			index.get_attendance_codes_for_year(["CL-A", "CL-MISSING"], 2026)
+
+	def test_out_of_scope_employee(self):
+		with self.assertRaises(frappe.PermissionError):
+			index.get_attendance_codes_for_year(["CL-A", "CL-B"], 2026)
+
+	def test_codes(self):
+		records = [("CL-A", date(2026, 1, 2), "Present"), ("CL-A", date(2026, 12, 31), "Absent")]
+
+		with patch.object(frappe.db, "sql", return_value=records), \
+			patch.object(index, "WorkingCalendar") as working_calendar:
+			working_calendar.return_value.get_year_codes.return_value = "W" * 365
+			result = index.get_attendance_codes_for_year(["CL-A"], 2026, rle=1)
+
+		self.assertEqual(result["codes"]["CL-A"], "1-1P362-1A")
+		self.assertEqual(result["calendar"]["CL-A"], "365W")
+
+
+LINK_COMPANIES = {
+	"CL-A": "Company A",
+	"CL-B": "Company B",
+}
@@ -0,0 +1,135 @@
+# Copyright (c) 2026, sj and Contributors
+# See license.txt
+
+from datetime import date, datetime, time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from saral_hr.punch_ingestion import (
+	compute_attendance,
+	get_punch_attendance_date,
+	group_employee_days,
+	pair_punches,
+)
+
+NIGHT_SHIFT = frappe._dict(
+	start_time=time(22), end_time=time(6), late_entry_grace=0, early_exit_grace=0, half_day_hours=4
+)
+DAY_SHIFT = frappe._dict(
+	start_time=time(9), end_time=time(18), late_entry_grace=10, early_exit_grace=10, half_day_hours=4
+)
+
+
+def punch(day, hour, minute=0, log_type=""):
+	return datetime(2026, 3, day, hour, minute), log_type
+
+
+def dated(company_link, attendance_day, punch_time_and_type):
+	"""group_employee_days input: punch with its attendance date"""
+	return (company_link, date(2026, 3, attendance_day), *punch_time_and_type)
+
+
+class TestPunchIngestion(FrappeTestCase):
+	def test_pair_punches_without_log_type(self):
+		in_time, out_time, seconds = pair_punches([punch(2, 9), punch(2, 13), punch(2, 18)])
+
+		self.assertEqual(in_time, datetime(2026, 3, 2, 9))
+		self.assertEqual(out_time, datetime(2026, 3, 2, 18))
+		self.assertEqual(seconds, 9 * 3600)
+
+	def test_pair_punches_single_punch(self):
+		self.assertEqual(pair_punches([punch(2, 9)]), (datetime(2026, 3, 2, 9), None, 0))
+
+	def test_pair_punches_with_log_type(self):
+		in_time, out_time, seconds = pair_punches([
+			punch(2, 9, log_type="IN"),
+			punch(2, 13, log_type="OUT"),
+			punch(2, 14, log_type="IN"),
+			punch(2, 18, log_type="OUT"),
+		])
+
+		self.assertEqual(in_time, datetime(2026, 3, 2, 9))
+		self.assertEqual(out_time, datetime(2026, 3, 2, 18))
+		self.assertEqual(seconds, 8 * 3600)
+
+	def test_compute_attendance_flags(self):
+		row = compute_attendance("CL-1", date(2026, 3, 2), [punch(2, 9, 30), punch(2, 12)], "General", DAY_SHIFT)
+
+		self.assertEqual(row["late_entry"], 1)
+		self.assertEqual(row["early_exit"], 1)
+		self.assertEqual(row["status"], "Half Day")
+
+	def test_compute_attendance_night_shift(self):
+		# 22:00 to 06:10 the next morning, one attendance for the 2nd
+		row = compute_attendance("CL-1", date(2026, 3, 2), [punch(2, 22), punch(3, 6, 10)], "Night", NIGHT_SHIFT)
+
+		self.assertEqual(row["late_entry"], 0)
+		self.assertEqual(row["early_exit"], 0)
+		self.assertEqual(row["status"], "Present")
+		self.assertEqual(row["working_hours"], 8.17)
+
+		row = compute_attendance("CL-1", date(2026, 3, 2), [punch(2, 22), punch(3, 3)], "Night", NIGHT_SHIFT)
+		self.assertEqual(row["early_exit"], 1)
+
+	def test_punch_attendance_date(self):
+		# after midnight within a night shift of the previous day
+		self.assertEqual(get_punch_attendance_date(punch(3, 6, 10)[0], NIGHT_SHIFT), date(2026, 3, 2))
+		# past the night shift window, or no night shift the day before
+		self.assertEqual(get_punch_attendance_date(punch(3, 21, 55)[0], NIGHT_SHIFT), date(2026, 3, 3))
+		self.assertEqual(get_punch_attendance_date(punch(3, 6, 10)[0], DAY_SHIFT), date(2026, 3, 3))
+		self.assertEqual(get_punch_attendance_date(punch(3, 6, 10)[0]), date(2026, 3, 3))
+
+	def test_group_night_shift_days(self):
+		days = list(group_employee_days(iter([
+			dated("CL-1", 2, punch(2, 22)),
+			dated("CL-1", 2, punch(3, 6, 5)),
+			dated("CL-1", 3, punch(3, 22)),
+			dated("CL-1", 3, punch(4, 6)),
+			dated("CL-1", 5, punch(5, 22)),
+		])))
+
+		self.assertEqual(
+			[(day, [p[0] for p in punches]) for _link, day, punches in days],
+			[
+				(date(2026, 3, 2), [datetime(2026, 3, 2, 22), datetime(2026, 3, 3, 6, 5)]),
+				(date(2026, 3, 3), [datetime(2026, 3, 3, 22), datetime(2026, 3, 4, 6)]),
+				(date(2026, 3, 5), [datetime(2026, 3, 5, 22)]),
+			],
+		)
+
+	def test_group_employee_days(self):
+		days = list(group_employee_days(iter([
+			dated("CL-1", 2, punch(2, 9)),
+			dated("CL-2", 2, punch(2, 9)),
+			dated("CL-1", 2, punch(2, 18)),
+			dated("CL-1", 4, punch(4, 9)),
+			dated("CL-1", 5, punch(5, 9)),
+		])))
+
+		self.assertEqual(
+			[(link, day, len(punches)) for link, day, punches in days],
+			[
+				("CL-1", date(2026, 3, 2), 2),
+				("CL-2", date(2026, 3, 2), 1),
+				("CL-1", date(2026, 3, 4), 1),
+				("CL-1", date(2026, 3, 5), 1),
+			],
+		)
+
+	def test_group_employee_days_out_of_order(self):
+		stats = frappe._dict(skipped=0, out_of_order=0)
+
+		days = list(group_employee_days(iter([
+			dated("CL-1", 2, punch(2, 9)),
+			dated("CL-1", 4, punch(4, 9)),
+			# 2nd March is already emitted
+			dated("CL-1", 2, punch(2, 18)),
+		]), stats))
+
+		self.assertEqual([(day, len(punches)) for _link, day, punches in days], [
+			(date(2026, 3, 2), 1),
+			(date(2026, 3, 4), 1),
+		])
+		self.assertEqual(stats.out_of_order, 1)
+		self.assertEqual(stats.skipped, 1)
@@ -0,0 +1,182 @@
+"""
+Working calendar of employees (Company Links)
+
+A calendar is compiled per year into a string with one character per day
+(index 0 = 1st January):
+
+    W  working day
+    O  weekly off (Company Link.weekly_off, or a weekly off row of the
+       Holiday List)
+    H  holiday of the Holiday List
+
+The Holiday List of an employee is Employee.holiday_list, or the
+Company.default_holiday_list of the Company Link's company.
+
+Compiled calendars are cached in Redis per (year, weekly_off, holiday_list),
+so the employees sharing a weekly off and a Holiday List share one calendar.
+The cache is cleared when a Holiday List changes. The weekly off and Holiday
+List of each employee are read fresh, so Company Link / Employee / Company
+changes are picked up without invalidation.
+"""
+
+import calendar
+from datetime import date
+
+import frappe
+from frappe.utils import add_days, getdate
+
+CALENDAR_CACHE_KEY = "saral_hr:working_calendar"
+
+WORKING_DAY = "W"
+WEEKLY_OFF = "O"
+HOLIDAY = "H"
+
+# lower-cased weekday name -> date.weekday()
+WEEKDAY_NUMBERS = {name.lower(): i for i, name in enumerate(calendar.day_name)}
+
+
+class WorkingCalendar:
+    """
+    Working calendars of many employees, for any year
+
+    Employee sources are fetched in one query; each distinct calendar is
+    taken from the cache (or compiled) once. Day lookups are then an index
+    into a string.
+    """
+
+    def __init__(self, employees):
+        self.sources = get_calendar_sources(employees)
+        self.calendars = {}
+
+    def get_year_codes(self, employee, year):
+        weekly_off, holiday_list = self.sources.get(employee) or (None, None)
+        key = (year, weekly_off, holiday_list)
+
+        if key not in self.calendars:
+            self.calendars[key] = get_calendar(year, weekly_off, holiday_list)
+
+        return self.calendars[key]
+
+    def get_codes(self, employee, from_date, to_date):
+        """Day codes from `from_date` to `to_date`, both inclusive"""
+        from_date = getdate(from_date)
+        to_date = getdate(to_date)
+
+        codes = []
+        for year in range(from_date.year, to_date.year + 1):
+            start = from_date if year == from_date.year else date(year, 1, 1)
+            end = to_date if year == to_date.year else date(year, 12, 31)
+            codes.append(
+                self.get_year_codes(employee, year)[day_of_year(start) : day_of_year(end) + 1]
+            )
+
+        return "".join(codes)
+
+    def get_day_type(self, employee, day):
+        day = getdate(day)
+        return self.get_year_codes(employee, day.year)[day_of_year(day)]
+
+    def is_working_day(self, employee, day):
+        return self.get_day_type(employee, day) == WORKING_DAY
+
+
+def day_of_year(day):
+    """0 for 1st January"""
+    return day.timetuple().tm_yday - 1
+
+
+def get_weekly_off_days(weekly_off):
+    """Lower-cased weekday names from a (comma separated) weekly_off value"""
+    if not weekly_off:
+        return []
+
+    return [d.strip().lower() for d in weekly_off.split(",") if d.strip()]
+
+
+def get_calendar_sources(employees):
+    """{company_link: (weekly_off, holiday_list)}"""
+    if not employees:
+        return {}
+
+    rows = frappe.db.sql("""
+        SELECT
+            cl.name,
+            cl.weekly_off,
+            COALESCE(NULLIF(e.holiday_list, ''), c.default_holiday_list)
+        FROM `tabCompany Link` cl
+        LEFT JOIN `tabEmployee` e ON e.name = cl.employee
+        LEFT JOIN `tabCompany` c ON c.name = cl.company
+        WHERE cl.name IN %(employees)s
+    """, {"employees": tuple(set(employees))})
+
+    return {name: (weekly_off or None, holiday_list or None) for name, weekly_off, holiday_list in rows}
+
+
+def get_calendar(year, weekly_off=None, holiday_list=None):
+    """Day codes of a year, compiled once and cached"""
+    key = f"{year}:{weekly_off or ''}:{holiday_list or ''}"
+    cache = frappe.cache()
+
+    codes = cache.hget(CALENDAR_CACHE_KEY, key)
+    if codes is None:
+        codes = compile_calendar(year, weekly_off, holiday_list)
+        cache.hset(CALENDAR_CACHE_KEY, key, codes)
+
+    return codes
+
+
+def compile_calendar(year, weekly_off=None, holiday_list=None):
+    first_day = date(year, 1, 1)
+    days = 366 if calendar.isleap(year) else 365
+    codes = bytearray(WORKING_DAY.encode() * days)
+
+    for day_name in get_weekly_off_days(weekly_off):
+        weekday = WEEKDAY_NUMBERS.get(day_name)
+        if weekday is None:
+            continue
+
+        offset = (weekday - first_day.weekday()) % 7
+        codes[offset::7] = WEEKLY_OFF.encode() * len(range(offset, days, 7))
+
+    if holiday_list:
+        for holiday_date, is_weekly_off in frappe.get_all(
+            "Holiday",
+            filters={
+                "parenttype": "Holiday List",
+                "parent": holiday_list,
+                "holiday_date": ["between", [first_day, date(year, 12, 31)]],
+            },
+            fields=["holiday_date", "weekly_off"],
+            as_list=True,
+        ):
+            i = day_of_year(getdate(holiday_date))
+
+            # the employee's own weekly off stays a weekly off
+            if codes[i] == ord(WORKING_DAY):
+                codes[i] = ord(WEEKLY_OFF if is_weekly_off else HOLIDAY)
+
+    return codes.decode()
+
+
+def clear_working_calendar_cache(doc=None, method=None):
+    """Drop every compiled calendar (Holiday List on_update / on_trash)"""
+    frappe.cache().delete_value(CALENDAR_CACHE_KEY)
+
+
+def get_weekday_dates(from_date, to_date, weekly_off):
+    """Dates between two dates (both inclusive) falling on the weekly off days"""
+    from_date = getdate(from_date)
+    to_date = getdate(to_date)
+    dates = []
+
+    for day_name in get_weekly_off_days(weekly_off):
+        weekday = WEEKDAY_NUMBERS.get(day_name)
+        if weekday is None:
+            continue
+
+        day = add_days(from_date, (weekday - from_date.weekday()) % 7)
+        while day <= to_date:
+            dates.append(day)
+            day = add_days(day, 7)
+
+    return sorted(dates)
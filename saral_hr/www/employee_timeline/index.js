@@ -20,17 +20,56 @@ frappe.ready(function () {
         window.location.href = '/app/company-link';
     });
 
-    // Extract employees from select options
-    const employees = Array.from(employeeSelect.options)
-        .filter(option => option.value)
-        .map(option => ({
-            name: option.value,
-            employee: option.textContent.trim()
-        }));
+    // Employees are searched on the server, one page at a time
+    const PAGE_LENGTH = 20;
+    let searchTerm = '';
+    let searchRequest = 0;
+    let searchTimer = null;
+    let hasMore = false;
+    let loadingMore = false;
 
     let selectedIndex = -1;
     let filteredEmployees = [];
 
+    function searchEmployees(term, start = 0) {
+        const request = ++searchRequest;
+        loadingMore = start > 0;
+
+        frappe.call({
+            method: 'saral_hr.www.employee_timeline.index.search_employees',
+            args: { txt: term, start: start, page_length: PAGE_LENGTH },
+            callback: (r) => {
+                // ignore answers to an older search
+                if (request !== searchRequest) return;
+
+                const data = r.message || {};
+                filteredEmployees = start ? filteredEmployees.concat(data.results || []) : (data.results || []);
+                hasMore = !!data.has_more;
+                loadingMore = false;
+
+                showResults(filteredEmployees);
+                if (!start) selectedIndex = -1;
+            },
+            error: () => {
+                loadingMore = false;
+            }
+        });
+    }
+
+    function scheduleSearch(term) {
+        searchTerm = term;
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(() => searchEmployees(term), 250);
+    }
+
+    // next page when the dropdown is scrolled to the bottom
+    searchResults.addEventListener('scroll', () => {
+        if (!hasMore || loadingMore) return;
+        if (searchResults.scrollTop + searchResults.clientHeight >= searchResults.scrollHeight - 20) {
+            searchEmployees(searchTerm, filteredEmployees.length);
+        }
+    });
+
     function showResults(results) {
         if (results.length === 0) {
             searchResults.innerHTML = '<div class="no-results">No employee found</div>';
@@ -40,7 +79,7 @@ frappe.ready(function () {
         }
 
         searchResults.innerHTML = results.map((emp, index) =>
-            `<div class="search-result-item" data-index="${index}" data-name="${emp.name}">
+            `<div class="search-result-item" data-index="${index}" data-name="${escapeHtml(emp.name)}">
                 ${escapeHtml(emp.employee)}
             </div>`
         ).join('');
@@ -49,8 +88,7 @@ frappe.ready(function () {
         const items = searchResults.querySelectorAll('.search-result-item');
         items.forEach((item, index) => {
             item.addEventListener('click', () => {
-                const empName = item.getAttribute('data-name');
-                const emp = employees.find(e => e.name === empName);
+                const emp = filteredEmployees[index];
                 if (emp) selectEmployee(emp);
             });
 
@@ -81,31 +119,26 @@ frappe.ready(function () {
 
     searchInput.addEventListener('focus', () => {
         if (searchInput.value.trim() === '') {
-            filteredEmployees = employees;
-            showResults(filteredEmployees);
+            scheduleSearch('');
         }
     });
 
     searchInput.addEventListener('input', () => {
-        const searchTerm = searchInput.value.toLowerCase().trim();
-        clearBtn.style.display = searchTerm ? 'flex' : 'none';
+        const term = searchInput.value.trim();
+        clearBtn.style.display = term ? 'flex' : 'none';
 
-        if (!searchTerm) {
+        if (!term) {
             // Clear timeline and hide containers because no employee selected
             timelineSection.style.display = 'none';
             noData.style.display = 'none';
             timelineContent.innerHTML = '';
 
-            filteredEmployees = employees;
-            showResults(filteredEmployees);
+            scheduleSearch('');
             selectedIndex = -1;
             return;
         }
 
-        filteredEmployees = employees.filter(emp =>
-            emp.employee.toLowerCase().includes(searchTerm)
-        );
-        showResults(filteredEmployees);
+        scheduleSearch(term);
         selectedIndex = -1;
     });
 
@@ -118,8 +151,7 @@ frappe.ready(function () {
         noData.style.display = 'none';
         timelineContent.innerHTML = '';
 
-        filteredEmployees = employees;
-        showResults(filteredEmployees);
+        scheduleSearch('');
         searchInput.focus();
     });
 
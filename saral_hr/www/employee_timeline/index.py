@@ -1,45 +1,83 @@
 import frappe
 from frappe import _
+from frappe.utils import cint, formatdate
+
+from saral_hr.permission import get_allowed_companies
+from saral_hr.saral_hr.doctype.employee.employee import EMPLOYEE_SEARCH_FIELDS
+
+EMPLOYEE_SEARCH_PAGE_LENGTH = 20
+EMPLOYEE_SEARCH_MAX_PAGE_LENGTH = 100
+
+EMPLOYEE_TIMELINE_CACHE_KEY = "saral_hr:employee_timeline"
+EMPLOYEE_TIMELINE_BATCH_LIMIT = 500
 
 def get_context(context):
     context.no_cache = 1
-    context.employees = get_employees()
     return context
 
-def get_employees():
-    """Get all employees with Aadhaar number"""
-    employees = frappe.db.sql("""
-        SELECT
-            name,
-            employee,
-            first_name,
-            last_name,
-            status,
-            aadhar_number
-        FROM `tabEmployee`
-    """, as_dict=1)
-
-    result = []
-    for emp in employees:
-        # Build display name from first_name + last_name or fallback to 'employee'
-        parts = []
-        if emp.get('first_name'):
-            parts.append(emp['first_name'].strip())
-        if emp.get('last_name'):
-            parts.append(emp['last_name'].strip())
-        
-        display_name = ' '.join(parts) if parts else emp['employee']
-        
-        # Add Aadhaar number if available
-        if emp.get('aadhar_number'):
-            display_name += f" ({emp['aadhar_number']})"
-
-        result.append({
-            'name': emp['name'],
-            'employee': display_name
-        })
-
-    return result
+def escape_like(txt):
+    return txt.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+@frappe.whitelist()
+def search_employees(txt="", start=0, page_length=EMPLOYEE_SEARCH_PAGE_LENGTH):
+    """
+    Typeahead search: employees whose display label (first name first), full
+    name, last name or Aadhaar number starts with `txt`, in the user's company
+    scope, one page at a time.
+
+    Every column is matched by prefix on its own index and the matches are
+    merged with UNION, so no full table scan happens whatever the number of
+    employees. The label shown is the stored Employee.display_label.
+    Returns {"results": [{name, employee}], "has_more": 0/1}.
+    """
+    txt = (txt or "").strip()
+    start = max(cint(start), 0)
+    page_length = min(max(cint(page_length), 1), EMPLOYEE_SEARCH_MAX_PAGE_LENGTH)
+
+    scope_condition = ""
+    companies = get_allowed_companies(frappe.session.user)
+
+    # apply company filter ONLY if restriction exists
+    if companies:
+        scope_condition = """AND EXISTS (
+            SELECT 1 FROM `tabCompany Link` cl
+            WHERE cl.employee = e.name AND cl.company IN %(companies)s
+        )"""
+
+    if txt:
+        # each branch only needs its first rows up to the end of the requested page
+        matches = " UNION ".join(
+            f"""(SELECT e.name FROM `tabEmployee` e
+                WHERE e.`{field}` LIKE %(prefix)s {scope_condition}
+                ORDER BY e.display_label, e.name LIMIT %(limit)s)"""
+            for field in EMPLOYEE_SEARCH_FIELDS
+        )
+        source = f"`tabEmployee` e INNER JOIN ({matches}) matched ON matched.name = e.name"
+        scope_condition = ""
+    else:
+        source = "`tabEmployee` e"
+
+    employees = frappe.db.sql(f"""
+        SELECT e.name, e.display_label
+        FROM {source}
+        WHERE 1=1 {scope_condition}
+        ORDER BY e.display_label, e.name
+        LIMIT %(page_length)s OFFSET %(start)s
+    """, {
+        "prefix": escape_like(txt) + "%",
+        "companies": tuple(companies or ()),
+        "limit": start + page_length + 1,
+        "page_length": page_length + 1,
+        "start": start,
+    }, as_dict=1)
+
+    return {
+        "results": [
+            {"name": emp.name, "employee": emp.display_label or emp.name}
+            for emp in employees[:page_length]
+        ],
+        "has_more": 1 if len(employees) > page_length else 0,
+    }
 
 @frappe.whitelist()
 def get_employee_timeline(employee):
@@ -50,51 +88,87 @@ def get_employee_timeline(employee):
     if not frappe.db.exists("Employee", employee):
         frappe.throw(_("Employee not found"))
 
-    timeline = frappe.db.sql("""
-        SELECT 
-            company,
-            date_of_joining AS start_date,
-            left_date AS end_date,
-            is_active
-        FROM `tabCompany Link`
-        WHERE employee = %(employee)s
-        ORDER BY 
-            is_active DESC,
-            COALESCE(date_of_joining, '1900-01-01') DESC
-    """, {"employee": employee}, as_dict=1)
-
-    for record in timeline:
-        record['start_date'] = frappe.utils.formatdate(record.get('start_date'), "dd-MM-yyyy") if record.get('start_date') else '-'
-        record['end_date'] = frappe.utils.formatdate(record.get('end_date'), "dd-MM-yyyy") if record.get('end_date') else None
-
-    return timeline
+    return get_employee_timelines([employee])[employee]
 
 @frappe.whitelist()
-def fix_employee_names():
+def get_employee_timelines(employees):
     """
-    Utility to generate display names dynamically with Aadhaar using 'employee' field.
+    Employment timelines of a set of employees: {employee: [records]}, each
+    record {company, start_date, end_date, is_active}, active first then
+    latest joining first, dates formatted dd-MM-yyyy. Only the records of
+    the user's company scope are returned, so unknown and out-of-scope
+    employees get an empty timeline.
+
+    Timelines are cached per employee; the ones not cached are read with one
+    query on the (employee, is_active, date_of_joining) index and grouped
+    here. The cache holds the full timelines and the scope is applied on
+    every read. The cache entry of an employee is dropped when one of its
+    Company Links changes.
     """
-    employees = frappe.db.sql("""
-        SELECT name, employee, first_name, last_name, aadhar_number
-        FROM `tabEmployee`
-    """, as_dict=1)
-
-    result = []
-    for emp in employees:
-        parts = []
-        if emp.get('first_name'):
-            parts.append(emp['first_name'].strip())
-        if emp.get('last_name'):
-            parts.append(emp['last_name'].strip())
-        display_name = ' '.join(parts) if parts else emp['employee']
-        
-        # Add Aadhaar number if available
-        if emp.get('aadhar_number'):
-            display_name += f" ({emp['aadhar_number']})"
-
-        result.append({
-            'name': emp['name'],
-            'employee': display_name
-        })
-
-    return result
\ No newline at end of file
+    frappe.has_permission("Company Link", "read", throw=True)
+
+    employees = frappe.parse_json(employees) if isinstance(employees, str) else employees
+    employees = list(dict.fromkeys(filter(None, employees or [])))
+
+    if len(employees) > EMPLOYEE_TIMELINE_BATCH_LIMIT:
+        frappe.throw(_("At most {0} employees per request").format(EMPLOYEE_TIMELINE_BATCH_LIMIT))
+
+    cache = frappe.cache()
+    timelines = {}
+    missing = []
+
+    for employee in employees:
+        timeline = cache.hget(EMPLOYEE_TIMELINE_CACHE_KEY, employee)
+        if timeline is None:
+            missing.append(employee)
+        else:
+            timelines[employee] = timeline
+
+    if missing:
+        fetched = {employee: [] for employee in missing}
+
+        for record in frappe.db.sql("""
+            SELECT
+                employee,
+                company,
+                date_of_joining AS start_date,
+                left_date AS end_date,
+                is_active
+            FROM `tabCompany Link`
+            WHERE employee IN %(employees)s
+            ORDER BY
+                employee,
+                is_active DESC,
+                COALESCE(date_of_joining, '1900-01-01') DESC
+        """, {"employees": tuple(missing)}, as_dict=1):
+            fetched[record.pop("employee")].append({
+                "company": record.company,
+                "start_date": formatdate(record.start_date, "dd-MM-yyyy") if record.start_date else '-',
+                "end_date": formatdate(record.end_date, "dd-MM-yyyy") if record.end_date else None,
+                "is_active": record.is_active,
+            })
+
+        for employee, timeline in fetched.items():
+            cache.hset(EMPLOYEE_TIMELINE_CACHE_KEY, employee, timeline)
+
+        timelines.update(fetched)
+
+    companies = get_allowed_companies(frappe.session.user)
+    if companies:
+        timelines = {
+            employee: [record for record in timeline if record["company"] in companies]
+            for employee, timeline in timelines.items()
+        }
+
+    return {employee: timelines[employee] for employee in employees}
+
+def clear_employee_timeline_cache(doc, method=None):
+    """Company Link hook: drop the cached timeline of its employee (and the previous one)"""
+    employees = {doc.employee}
+
+    previous = doc.get_doc_before_save() if method == "on_update" else None
+    if previous:
+        employees.add(previous.employee)
+
+    for employee in filter(None, employees):
+        frappe.cache().hdel(EMPLOYEE_TIMELINE_CACHE_KEY, employee)
@@ -14,17 +14,46 @@ frappe.ready(function () {
     // ================================
     // Fetch employees
     // ================================
+    // Roster is kept in sessionStorage (without Aadhaar numbers) and only
+    // re-sent when its version changes
+    const rosterStorageKey = `saral_hr_roster:${frappe.session.user}`;
+    let cachedRoster = null;
+    try {
+        // drop what older versions left in localStorage
+        localStorage.removeItem(rosterStorageKey);
+        cachedRoster = JSON.parse(sessionStorage.getItem(rosterStorageKey) || "null");
+    } catch (e) {
+        cachedRoster = null;
+    }
+
     frappe.call({
         method: "saral_hr.www.mark_attendance.index.get_active_employees",
+        args: { version: cachedRoster ? cachedRoster.version : null },
         callback: function (r) {
-            if (r.message) {
+            let roster = r.message;
+            if (roster && roster.not_modified && cachedRoster) {
+                roster = cachedRoster;
+            } else if (roster) {
+                try {
+                    sessionStorage.setItem(rosterStorageKey, JSON.stringify({
+                        version: roster.version,
+                        employees: (roster.employees || []).map(
+                            ({ aadhaar_number, ...row }) => row
+                        )
+                    }));
+                } catch (e) {
+                    // storage full or disabled, roster is just not reused
+                }
+            }
+
+            if (roster && roster.employees) {
                 employeeSelect.innerHTML = `<option value="">Select Employee</option>`;
 
                 window.employeeCompanyMap = {};
                 window.employeeCLMap = {};
                 window.employeeWeeklyOffMap = {};
 
-                r.message.forEach(row => {
+                roster.employees.forEach(row => {
                     let opt = document.createElement("option");
                     opt.value = row.employee;
 
@@ -312,20 +341,21 @@ frappe.ready(function () {
         if (!employee) return;
 
         const clId = window.employeeCLMap[employee];
-        const calls = [];
+        const attendance = {};
 
         Object.entries(window.attendanceTableData).forEach(([date, status]) => {
-            if (status) {
-                calls.push(frappe.call({
-                    method: "saral_hr.www.mark_attendance.index.save_attendance",
-                    args: { employee: clId, attendance_date: date, status }
-                }));
-            }
+            if (status) attendance[date] = status;
         });
 
-        Promise.all(calls).then(() => {
-            frappe.show_alert({ message: "Attendance updated successfully", indicator: "green" });
-            generateTable();
+        if (!Object.keys(attendance).length) return;
+
+        frappe.call({
+            method: "saral_hr.www.mark_attendance.index.save_attendance_bulk",
+            args: { employee: clId, attendance },
+            callback: function () {
+                frappe.show_alert({ message: "Attendance updated successfully", indicator: "green" });
+                generateTable();
+            }
         });
     };
 
@@ -334,6 +364,8 @@ frappe.ready(function () {
     // ================================
     let currentCalendarYear = 2025;
     let yearAttendanceData = {};
+    // W (working day), O (weekly off) or H (holiday) per day of the year
+    let yearCalendarCodes = "";
 
     // Helper function to normalize date formats
     function normalizeDateKey(dateStr) {
@@ -390,29 +422,28 @@ frappe.ready(function () {
             return;
         }
 
-        const startDate = `${currentCalendarYear}-01-01`;
-        const endDate = `${currentCalendarYear}-12-31`;
-
         console.log('Loading attendance for:', clId, 'Year:', currentCalendarYear);
 
         frappe.call({
-            method: "saral_hr.www.mark_attendance.index.get_attendance_between_dates",
+            method: "saral_hr.www.mark_attendance.index.get_attendance_codes_for_year",
             args: {
-                employee: clId,
-                start_date: startDate,
-                end_date: endDate
+                employees: [clId],
+                year: currentCalendarYear,
+                rle: 1
             },
             callback: function (res) {
-                const rawData = res.message || {};
+                const data = res.message || {};
+                const codes = decodeRuns((data.codes || {})[clId] || "");
+                yearCalendarCodes = decodeRuns((data.calendar || {})[clId] || "");
 
-                // Normalize all date keys
+                // One code per day of the year, index 0 = 1st January
                 yearAttendanceData = {};
-                Object.entries(rawData).forEach(([dateKey, status]) => {
-                    const normalized = normalizeDateKey(dateKey);
-                    if (normalized) {
-                        yearAttendanceData[normalized] = status;
+                for (let i = 0; i < codes.length; i++) {
+                    const status = attendanceCodeStatus[codes[i]];
+                    if (status) {
+                        yearAttendanceData[normalizeDateKey(new Date(currentCalendarYear, 0, i + 1))] = status;
                     }
-                });
+                }
 
                 console.log('✅ Loaded attendance data:', Object.keys(yearAttendanceData).length, 'records');
 
@@ -424,10 +455,32 @@ frappe.ready(function () {
         });
     }
 
-    function renderMonthsGrid() {
-        const employee = employeeSelect.value;
-        const weeklyOffDays = window.employeeWeeklyOffMap[employee] || [];
+    const attendanceCodeStatus = {
+        P: 'Present',
+        A: 'Absent',
+        H: 'Half Day',
+        L: 'On Leave'
+    };
+
+    // "3-2P" -> "---PP"
+    function decodeRuns(encoded) {
+        let decoded = '';
+        const runs = encoded.match(/\d+\D/g) || [];
+        runs.forEach(run => {
+            decoded += run.slice(-1).repeat(parseInt(run.slice(0, -1), 10));
+        });
+        return decoded;
+    }
+
+    // 0 for 1st January
+    function dayOfYear(date) {
+        return Math.round(
+            (Date.UTC(date.getFullYear(), date.getMonth(), date.getDate()) -
+                Date.UTC(date.getFullYear(), 0, 1)) / 86400000
+        );
+    }
 
+    function renderMonthsGrid() {
         const monthsGrid = document.getElementById('months-grid');
         const monthNames = [
             'January', 'February', 'March', 'April', 'May', 'June',
@@ -466,11 +519,7 @@ frappe.ready(function () {
                 const date = new Date(currentCalendarYear, monthIndex, day);
                 const dateKey = normalizeDateKey(date);
                 const isToday = date.toDateString() === today.toDateString();
-                const dayName = date
-                    .toLocaleDateString("en-US", { weekday: "long" })
-                    .toLowerCase();
-
-                const isWeeklyOff = weeklyOffDays.includes(dayName);
+                const dayType = yearCalendarCodes[dayOfYear(date)];
 
 
                 let dayClass = 'mini-calendar-day';
@@ -488,8 +537,10 @@ frappe.ready(function () {
                 } else if (status === 'Half Day') {
                     dayClass += ' halfday';
                     totalColoredDays++;
-                } else if (isWeeklyOff) {
+                } else if (dayType === 'O') {
                     dayClass += ' weekend'; // blue weekly off
+                } else if (dayType === 'H') {
+                    dayClass += ' holiday';
                 }
 
 
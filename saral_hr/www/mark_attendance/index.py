@@ -1,39 +1,90 @@
+import hashlib
+from datetime import date
+from itertools import groupby
+
 import frappe
-from frappe.utils import getdate
+from frappe.utils import cint, getdate
+
+from saral_hr.company_link_cache import get_company_link, get_many
+from saral_hr.permission import get_allowed_companies
+from saral_hr.roster import ROSTER_CACHE_KEY, get_roster_version
+from saral_hr.saral_hr.doctype.attendance.attendance import get_attendance_statuses, upsert_attendance
+from saral_hr.working_calendar import WEEKLY_OFF, WorkingCalendar
+
+# one character per day in get_attendance_codes_for_year
+ATTENDANCE_STATUS_CODES = {
+    "Present": "P",
+    "Absent": "A",
+    "Half Day": "H",
+    "On Leave": "L",
+}
+UNMARKED_CODE = b"-"
+ATTENDANCE_YEAR_RANGE = (1900, 2999)
+
 
 @frappe.whitelist()
-def get_active_employees():
+def get_active_employees(version=None):
+    """
+    Active Company Links (with Aadhaar number) in the user's company scope.
+
+    The roster is cached per company scope under a version stamp, and the
+    version returned to the client includes the scope. A client sending the
+    version it already has (or an If-None-Match header) gets
+    {"not_modified": 1, "version": ...} instead of the full list; after a
+    scope change its version no longer matches.
+    """
     user = frappe.session.user
 
     # get company restrictions (if any)
-    companies = frappe.get_all(
-        "User Permission",
-        filters={
-            "user": user,
-            "allow": "Company"
-        },
-        pluck="for_value"
+    companies = get_allowed_companies(user)
+
+    scope_key = ",".join(sorted(companies)) or "*"
+
+    # the version depends on the scope too, so a changed User Permission
+    # never matches the version the client already has
+    current_version = "{0}-{1}".format(
+        get_roster_version(), hashlib.md5(scope_key.encode()).hexdigest()[:8]
     )
+    version = version or (frappe.get_request_header("If-None-Match") or "").strip('"')
 
-    filters = {"is_active": 1}
+    if version and version == current_version:
+        return {"not_modified": 1, "version": current_version}
 
-    # apply company filter ONLY if restriction exists
-    if companies:
-        filters["company"] = ["in", companies]
+    cache = frappe.cache()
+    roster = cache.hget(ROSTER_CACHE_KEY, scope_key)
 
-    employees = frappe.get_all(
-        "Company Link",
-        filters=filters,
-        fields=["name", "employee", "full_name", "company", "weekly_off"],
-        order_by="full_name asc"
-    )
+    if not roster or roster.get("version") != current_version:
+        roster = {
+            "version": current_version,
+            "employees": get_roster(companies)
+        }
+        cache.hset(ROSTER_CACHE_KEY, scope_key, roster)
+
+    return roster
 
-    # Fetch Aadhaar numbers
-    for emp in employees:
-        aadhaar = frappe.db.get_value("Employee", emp.employee, "aadhar_number")
-        emp["aadhaar_number"] = aadhaar or ""
 
-    return employees
+def get_roster(companies=None):
+    """Active Company Links joined with the Employee's Aadhaar number"""
+    conditions = ""
+
+    # apply company filter ONLY if restriction exists
+    if companies:
+        conditions = "AND cl.company IN %(companies)s"
+
+    return frappe.db.sql(f"""
+        SELECT
+            cl.name,
+            cl.employee,
+            cl.full_name,
+            cl.company,
+            cl.weekly_off,
+            IFNULL(e.aadhar_number, '') AS aadhaar_number
+        FROM `tabCompany Link` cl
+        LEFT JOIN `tabEmployee` e ON e.name = cl.employee
+        WHERE cl.is_active = 1
+            {conditions}
+        ORDER BY cl.full_name ASC
+    """, {"companies": tuple(companies or ())}, as_dict=True)
 
 
 @frappe.whitelist()
@@ -68,66 +119,72 @@ def get_attendance_between_dates(employee, start_date, end_date):
 
 @frappe.whitelist()
 def save_attendance(employee, attendance_date, status):
+    result = save_attendance_bulk(employee, {str(getdate(attendance_date)): status})
+    return result.get(str(getdate(attendance_date)), "success")
+
+
+@frappe.whitelist()
+def save_attendance_bulk(employee, attendance):
+    """
+    Save a {date: status} map for one employee (Company Link) in a single
+    request: one permission check, one upsert per chunk of dates and a
+    single commit.
+
+    Returns {date: "success" | "skipped_weekly_off"}.
+    """
     user = frappe.session.user
-    attendance_date = getdate(attendance_date)
+    attendance = frappe.parse_json(attendance) or {}
 
-    # company restriction check (dynamic)
-    companies = frappe.get_all(
-        "User Permission",
-        filters={
-            "user": user,
-            "allow": "Company"
-        },
-        pluck="for_value"
-    )
+    marks = {}
+    for attendance_date, status in attendance.items():
+        if status:
+            marks[getdate(attendance_date)] = status
 
-    if companies:
-        allowed = frappe.db.exists(
-            "Company Link",
-            {
-                "employee": employee,
-                "company": ["in", companies]
-            }
-        )
+    if not marks:
+        return {}
+
+    # rows are written with raw SQL, so links and statuses are checked here
+    company_link = get_company_link(employee)
+
+    if not company_link:
+        frappe.throw("Company Link {0} not found".format(employee))
+
+    statuses = get_attendance_statuses()
+    invalid = sorted({status for status in marks.values() if status not in statuses})
+
+    if invalid:
+        frappe.throw("Invalid attendance status: {0}".format(", ".join(invalid)))
+
+    # company restriction check (dynamic)
+    companies = get_allowed_companies(user)
 
-        if not allowed:
-            frappe.throw("Not permitted to mark attendance for this employee")
+    if companies and company_link.company not in companies:
+        frappe.throw("Not permitted to mark attendance for this employee")
 
     # weekly off check
-    weekly_off = frappe.db.get_value(
-        "Company Link",
-        {"employee": employee},
-        "weekly_off"
-    )
+    working_calendar = WorkingCalendar([employee])
 
-    if weekly_off:
-        weekly_off_days = [d.strip().lower() for d in weekly_off.split(",")]
-        if attendance_date.strftime("%A").lower() in weekly_off_days:
-            return "skipped_weekly_off"
+    results = {}
+    rows = []
 
-    existing_attendance = frappe.db.get_value(
-        "Attendance",
-        {"employee": employee, "attendance_date": attendance_date},
-        "name"
-    )
+    for attendance_date, status in sorted(marks.items()):
+        date_key = str(attendance_date)
+
+        if working_calendar.get_day_type(employee, attendance_date) == WEEKLY_OFF:
+            results[date_key] = "skipped_weekly_off"
+            continue
 
-    if existing_attendance:
-        doc = frappe.get_doc("Attendance", existing_attendance)
-        doc.status = status
-        doc.flags.ignore_validate = True
-        doc.save(ignore_permissions=True)
-    else:
-        doc = frappe.get_doc({
-            "doctype": "Attendance",
+        rows.append({
             "employee": employee,
             "attendance_date": attendance_date,
             "status": status
         })
-        doc.flags.ignore_validate = True
-        doc.insert(ignore_permissions=True)
+        results[date_key] = "success"
+
+    upsert_attendance(rows)
 
     frappe.db.commit()
-    return "success"
+    return results
 
 
 @frappe.whitelist()
@@ -152,3 +209,101 @@ def get_employee_attendance_for_year(employee, year):
         attendance_map[str(r.attendance_date)] = r.status
 
     return attendance_map
+
+
+@frappe.whitelist()
+def get_attendance_codes_for_year(employees, year, rle=0):
+    """
+    Compact year attendance for one or many employees (Company Links).
+
+    Each employee gets one status-code string with a character per day of
+    the year (index 0 = 1st January): P, A, H, L (On Leave) or "-" when
+    unmarked. With `rle` set the string is run-length encoded, e.g.
+    "31-28P..." (count followed by code).
+
+    `calendar` holds the working calendar of each employee in the same
+    form: W (working day), O (weekly off) or H (holiday).
+    """
+    employees = frappe.parse_json(employees) if employees else []
+    if isinstance(employees, str):
+        employees = [employees]
+
+    frappe.has_permission("Attendance", "read", throw=True)
+
+    year = cint(year)
+    if not employees or not year:
+        return {}
+
+    if not ATTENDANCE_YEAR_RANGE[0] <= year <= ATTENDANCE_YEAR_RANGE[1]:
+        frappe.throw("Invalid year {0}".format(year))
+
+    company_links = get_many(employees)
+    not_found = [employee for employee in employees if employee not in company_links]
+
+    if not_found:
+        frappe.throw(
+            "Company Link {0} not found".format(", ".join(not_found)),
+            frappe.DoesNotExistError,
+        )
+
+    companies = get_allowed_companies(frappe.session.user)
+    not_permitted = [
+        employee for employee, company_link in company_links.items()
+        if companies and company_link.company not in companies
+    ]
+
+    if not_permitted:
+        frappe.throw(
+            "Not permitted to view attendance of {0}".format(", ".join(not_permitted)),
+            frappe.PermissionError,
+        )
+
+    start_date = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - start_date).days
+
+    conditions = ""
+    if companies:
+        conditions = "AND company IN %(companies)s"
+
+    records = frappe.db.sql(f"""
+        SELECT employee, attendance_date, status
+        FROM `tabAttendance`
+        WHERE employee IN %(employees)s
+            AND attendance_date BETWEEN %(start_date)s AND %(end_date)s
+            {conditions}
+    """, {
+        "employees": tuple(employees),
+        "start_date": start_date,
+        "end_date": date(year, 12, 31),
+        "companies": tuple(companies or ())
+    })
+
+    codes = {employee: bytearray(UNMARKED_CODE * days) for employee in employees}
+
+    for employee, attendance_date, status in records:
+        code = ATTENDANCE_STATUS_CODES.get(status)
+        if code:
+            codes[employee][(getdate(attendance_date) - start_date).days] = ord(code)
+
+    working_calendar = WorkingCalendar(employees)
+
+    def encode(day_codes):
+        return encode_runs(day_codes) if cint(rle) else day_codes
+
+    return {
+        "year": year,
+        "rle": cint(rle),
+        "codes": {
+            employee: encode(day_codes.decode())
+            for employee, day_codes in codes.items()
+        },
+        "calendar": {
+            employee: encode(working_calendar.get_year_codes(employee, year))
+            for employee in employees
+        }
+    }
+
+
+def encode_runs(codes):
+    """Run-length encode a status-code string: "---PP" -> "3-2P" """
+    return "".join(f"{len(list(run))}{code}" for code, run in groupby(codes))